@@ -23,9 +23,10 @@
 
 "The FreeCAD Arch Vector Rendering Module"
 
-import FreeCAD,math,Part,ArchCommands,DraftVecUtils,DraftGeomUtils
+import FreeCAD,math,Part,ArchCommands,DraftVecUtils,DraftGeomUtils,heapq
 
 MAXLOOP = 10 # the max number of loop before abort
+GRAPHSORT = True # if True, faces are sorted with an occlusion graph, otherwise with the former insertion sort
 
 # WARNING: in this module, faces are lists whose first item is the actual OCC face, the
 # other items being additional information such as color, etc.
@@ -457,6 +458,80 @@ class Renderer:
         else:
             return None
 
+    def getCandidatePairs(self,faces):
+        """returns the pairs of indices of faces whose bounding boxes overlap
+        in the working plane, found with a uniform 2D grid"""
+        boxes = [f[0].BoundBox for f in faces]
+        xmin = min([b.XMin for b in boxes])
+        ymin = min([b.YMin for b in boxes])
+        xmax = max([b.XMax for b in boxes])
+        ymax = max([b.YMax for b in boxes])
+        n = int(math.ceil(math.sqrt(len(faces))))
+        size = max(xmax-xmin,ymax-ymin)/n
+        if size <= 0:
+            size = 1
+        grid = {}
+        for i,b in enumerate(boxes):
+            for cx in range(int((b.XMin-xmin)/size),int((b.XMax-xmin)/size)+1):
+                for cy in range(int((b.YMin-ymin)/size),int((b.YMax-ymin)/size)+1):
+                    grid.setdefault((cx,cy),[]).append(i)
+        pairs = set()
+        for cell in grid.values():
+            for k,i in enumerate(cell):
+                b1 = boxes[i]
+                for j in cell[k+1:]:
+                    if (i,j) in pairs:
+                        continue
+                    b2 = boxes[j]
+                    if (b1.XMax < b2.XMin) or (b1.XMin > b2.XMax) or (b1.YMax < b2.YMin) or (b1.YMin > b2.YMax):
+                        continue
+                    pairs.add((i,j))
+        return pairs
+
+    def graphSort(self,faces):
+        """sorts faces from back to front by building an occlusion graph between the faces
+        that overlap in the working plane, and sorting it topologically. Cycles are broken
+        by taking the farthest face, so no face is lost"""
+        faces = [f for f in faces if f]
+        if len(faces) <= 1:
+            return faces
+        behind = [[] for f in faces] # faces that must be drawn after each face
+        count = [0 for f in faces] # number of faces that must be drawn before each face
+        pairs = self.getCandidatePairs(faces)
+        if DEBUG: print len(pairs), " pairs of faces to compare"
+        for i,j in pairs:
+            r = self.compare(faces[i],faces[j])
+            if r == 1:
+                behind[j].append(i)
+                count[i] += 1
+            elif r == 2:
+                behind[i].append(j)
+                count[j] += 1
+        zmin = [f[0].BoundBox.ZMin for f in faces]
+        queue = [(zmin[i],i) for i in range(len(faces)) if count[i] == 0]
+        heapq.heapify(queue)
+        done = [False for f in faces]
+        sfaces = []
+        cycles = 0
+        while len(sfaces) < len(faces):
+            if not queue:
+                # all remaining faces are part of a cycle, break it at the farthest one
+                i = min([(zmin[i],i) for i in range(len(faces)) if not done[i]])[1]
+                count[i] = 0
+                heapq.heappush(queue,(zmin[i],i))
+                cycles += 1
+            i = heapq.heappop(queue)[1]
+            if done[i]:
+                continue
+            done[i] = True
+            sfaces.append(faces[i])
+            for j in behind[i]:
+                count[j] -= 1
+                if (count[j] == 0) and not done[j]:
+                    heapq.heappush(queue,(zmin[j],j))
+        if DEBUG: print cycles, " cycles broken"
+        return sfaces
+
     def sort(self):
         "projects a shape on the WP"
         if DEBUG: print "\n\n======> Starting sort\n\n"
@@ -472,7 +547,11 @@ class Renderer:
             if DEBUG: print "Done reorientation"
         faces = self.faces[:]
         if DEBUG: print "sorting ",len(self.faces)," faces"
-        sfaces = []
+        if GRAPHSORT:
+            sfaces = self.graphSort(faces)
+            faces = []
+        else:
+            sfaces = []
         loopcount = 0
         notfoundstack = 0
         while faces:
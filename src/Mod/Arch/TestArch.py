@@ -165,6 +165,26 @@ class ArchTest(unittest.TestCase):
         r = (w.Shape.Volume < 0.75)
         self.failUnless(r,"Arch Remove failed")
 
+    def testIfcTokenizer(self):
+        FreeCAD.Console.PrintLog ('Checking Arch IFC tokenizer...\n')
+        import ifcReader, tempfile
+        fd, path = tempfile.mkstemp(suffix=".ifc")
+        f = os.fdopen(fd, "w")
+        f.write("ISO-10303-21;\nHEADER;\nFILE_DESCRIPTION(('x'),'2;1');\nENDSEC;\nDATA;\n")
+        f.write("#1=IFCCARTESIANPOINT((0.,1.5,0.));\n/* comment; */\n")
+        f.write("#2=IFCLABELLED('it''s; (a)',IFCLABEL('y,z'),\n  (#1,/* (#9) */\n  #1),$);\n")
+        f.write("#3=IFCLABELLED('a/*b*/c',$);\n")
+        f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+        f.close()
+        t = ifcReader.IfcTokenizer(path,chunksize=4)
+        records = list(t)
+        r = (len(records) == 3) and (t.readRecord(2) == records[1]) and (t.readRecord(3) == records[2])
+        r = r and (ifcReader.splitAttributes(records[1][2]) == ["it''s; (a)","IFCLABEL('y,z')",["#1","#1"],None])
+        r = r and (ifcReader.splitAttributes(records[2][2]) == ["a/*b*/c",None])
+        t.close()
+        os.remove(path)
+        self.failUnless(r,"Arch IFC tokenizer failed")
+
     def tearDown(self):
         FreeCAD.closeDocument("ArchTest")
         pass
@@ -21,7 +21,7 @@
 #*                                                                         *
 #***************************************************************************
 
-import os, re, copy
+import os, re, copy, collections, hashlib, tempfile, cPickle, cStringIO
 
 __title__="FreeCAD IFC parser"
 __author__ = "Yorik van Havre, Marijn van Aerle"
@@ -38,6 +38,7 @@ Usage:
         myent = ifcdoc.getEnt(20) # alternative way
         polylines = ifcdoc.getEnt("IFCPOLYLINE") # returns a list
         print myent.attributes
+        bigdoc = ifcReader.IfcDocument("path/to/big.ifc",lazy=True) # entities are created on demand
 
 The ifc document contains a list of entities, that can be retrieved
 by iterating the list (indices corresponds to the entities ids)
@@ -59,8 +60,31 @@ will be drastically different.
 '''
 
 IFCLINE_RE = re.compile("#(\d+)[ ]?=[ ]?(.*?)\((.*)\);[\\r]?$")
+STEP_DELIMITER_RE = re.compile("'|;|/\*")
+STEP_REFERENCE_RE = re.compile("'(?:[^']|'')*'|#(\d+)")
+STEP_ATTRIBUTE_RE = re.compile("\s*('(?:[^']|'')*'|[A-Za-z_][A-Za-z0-9_]*\s*\(|[(),]|[^(),'\s]+)")
+CHUNKSIZE = 1048576 # number of bytes read at once by the tokenizer
+CACHESIZE = 10000 # max number of entities kept in memory by lazy documents
+SCHEMA_CACHE_VERSION = 1 # increase when the compiled schema format changes
 DEBUG = False
 
+schemas = {} # compiled schemas already loaded in this session, by filename
+
+def getSchema(filename):
+    "returns an IfcSchema for the given file, compiling it only once per session"
+    key = (os.path.abspath(filename), os.path.getmtime(filename)) if os.path.exists(filename) else filename
+    if not key in schemas:
+        schemas[key] = IfcSchema(filename)
+    return schemas[key]
+
+def getCacheDir():
+    "returns a user-writable directory where compiled schemas are stored"
+    try:
+        import FreeCAD
+        return FreeCAD.ConfigGet("UserAppData")
+    except:
+        return tempfile.gettempdir()
+
 class IfcSchema:
     SIMPLETYPES = ["INTEGER", "REAL", "STRING", "NUMBER", "LOGICAL", "BOOLEAN"]
     NO_ATTR = ["WHERE", "INVERSE","WR2","WR3", "WR4", "WR5", "UNIQUE", "DERIVE"]
@@ -70,11 +94,78 @@ class IfcSchema:
         if not os.path.exists(filename):
             raise ImportError("no IFCSchema file found!")
         else:
-            self.file = open(self.filename)
-            self.data = self.file.read()
-            self.types = self.readTypes()
-            self.entities = self.readEntities()
-            if DEBUG: print "Parsed from schema %s: %s entities and %s types" % (self.filename, len(self.entities), len(self.types))
+            f = open(self.filename)
+            self.data = f.read()
+            f.close()
+            self.signature = hashlib.md5(self.data).hexdigest()
+            if not self.readCache():
+                self.types = self.readTypes()
+                self.entities = self.readEntities()
+                self.compile()
+                self.writeCache()
+                if DEBUG: print "Parsed from schema %s: %s entities and %s types" % (self.filename, len(self.entities), len(self.types))
+
+    def getCacheFile(self):
+        "returns the path of the compiled version of this schema"
+        name = os.path.splitext(os.path.basename(self.filename))[0]
+        return os.path.join(getCacheDir(), name + ".ifcschema")
+
+    def readCache(self):
+        "loads the compiled schema from the cache file, if it is valid"
+        try:
+            f = open(self.getCacheFile(), "rb")
+            cache = cPickle.load(f)
+            f.close()
+        except:
+            return False
+        if (cache.get("version") != SCHEMA_CACHE_VERSION) or (cache.get("signature") != self.signature):
+            if DEBUG: print "Outdated schema cache: ", self.getCacheFile()
+            return False
+        for k in ["types", "entities", "attributes", "attributeNames", "supertypes", "subtypes"]:
+            setattr(self, k, cache[k])
+        if DEBUG: print "Loaded schema %s from cache" % self.filename
+        return True
+
+    def writeCache(self):
+        "saves the compiled schema, failures are not fatal"
+        cache = {"version": SCHEMA_CACHE_VERSION, "signature": self.signature}
+        for k in ["types", "entities", "attributes", "attributeNames", "supertypes", "subtypes"]:
+            cache[k] = getattr(self, k)
+        try:
+            f = open(self.getCacheFile(), "wb")
+            cPickle.dump(cache, f, cPickle.HIGHEST_PROTOCOL)
+            f.close()
+        except:
+            if DEBUG: print "Unable to write schema cache: ", self.getCacheFile()
+
+    def compile(self):
+        """
+        Builds flat tables from the parsed entities: the ordered attributes
+        and attribute names of each entity including those of its supertypes,
+        and the supertypes and subtypes of each entity
+        """
+        self.attributes = {}
+        self.attributeNames = {}
+        self.supertypes = {}
+        self.subtypes = {}
+        for name, ent in self.entities.iteritems():
+            chain = []
+            attrs = []
+            while ent != None:
+                this_ent_attrs = copy.copy(ent["attributes"])
+                this_ent_attrs.reverse()
+                attrs.extend(this_ent_attrs)
+                if ent["supertype"]:
+                    chain.append(ent["supertype"])
+                ent = self.entities.get(ent["supertype"], None)
+            attrs.reverse()
+            self.attributes[name] = attrs
+            self.attributeNames[name] = [a[0] for a in attrs]
+            self.supertypes[name] = chain
+        for name in self.entities.keys():
+            self.subtypes.setdefault(name, [name])
+            for sup in self.supertypes[name]:
+                self.subtypes.setdefault(sup, [sup]).append(name)
 
     def readTypes(self):
         """
@@ -133,17 +224,29 @@ class IfcSchema:
         """
         Get all attributes af an entity, including supertypes
         """
-        ent = self.entities[name]
+        return list(self.attributes[name])
 
-        attrs = []
-        while ent != None:
-            this_ent_attrs = copy.copy(ent["attributes"])
-            this_ent_attrs.reverse()
-            attrs.extend(this_ent_attrs)
-            ent = self.entities.get(ent["supertype"], None)
+    def getAttributeNames(self, name):
+        """
+        Get the names of all attributes of an entity, in order. The
+        returned list is shared and must not be modified
+        """
+        return self.attributeNames[name]
 
-        attrs.reverse()
-        return attrs
+    def getSupertypes(self, name):
+        """
+        Returns the names of all the supertypes of an entity,
+        the nearest first
+        """
+        return self.supertypes[name.upper()]
+
+    def getSubtypes(self, name):
+        """
+        Returns the given entity name followed by the names
+        of all its subtypes, recursively
+        """
+        name = name.upper()
+        return self.subtypes.get(name, [name])
 
     def capitalize(self, name):
         "returns a capitalized version of a type"
@@ -153,44 +256,259 @@ class IfcSchema:
             name = self.data[i1:i2]
         return name
 
+class IfcTokenizer:
+    """
+    Single-pass streaming reader for ifc (STEP) files. The file is read in
+    chunks and split into statements, handling quoted strings (with escaped
+    '' quotes), comments and records spanning several lines. Iterating over
+    the tokenizer yields an (id, type, attributes) tuple for each entity,
+    attributes being the raw text between the outer parentheses. While
+    iterating, the header is collected in self.header and self.index maps
+    each entity id to the (offset, length) of its record in the file.
+    """
+
+    def __init__(self, filename, chunksize=CHUNKSIZE):
+        self.filename = filename
+        self.chunksize = chunksize
+        self.header = 'HEADER '
+        self.index = {}
+        self.file = None
+
+    def __iter__(self):
+        readheader = False
+        for offset, length, statement in self.statements():
+            if statement.startswith("#"):
+                record = self.parseRecord(statement)
+                if record:
+                    self.index[record[0]] = (offset, length)
+                    yield record
+            elif statement.startswith("HEADER"):
+                readheader = True
+            elif readheader:
+                if statement.startswith("ENDSEC"):
+                    readheader = False
+                else:
+                    self.header += statement + ";\n"
+
+    def statements(self, f=None):
+        """
+        Yields (offset, length) and the cleaned text of each statement
+        of the file (or of the given file object), without its terminating
+        semicolon and without the comments found outside strings
+        """
+        own = f is None
+        if own:
+            f = open(self.filename, "rb")
+        buf = ""
+        base = 0        # file offset of buf[0]
+        start = 0       # start of the current statement in buf
+        seg = 0         # start of the text following the last comment in buf
+        parts = []      # text of the current statement before the last comment
+        pos = 0         # scanning position in buf
+        instring = False
+        while True:
+            chunk = f.read(self.chunksize)
+            if not chunk:
+                break
+            buf = buf[start:] + chunk
+            base += start
+            pos -= start
+            seg -= start
+            start = 0
+            while True:
+                if instring:
+                    q = buf.find("'", pos)
+                    if q < 0:
+                        pos = len(buf)
+                        break
+                    # an escaped '' quote simply reopens the string
+                    instring = False
+                    pos = q + 1
+                    continue
+                m = STEP_DELIMITER_RE.search(buf, pos)
+                if not m:
+                    # the last char might be the start of a comment
+                    pos = max(pos, len(buf) - 1)
+                    break
+                c = m.group()
+                if c == "'":
+                    instring = True
+                    pos = m.end()
+                elif c == ";":
+                    parts.append(buf[seg:m.start()])
+                    yield base + start, m.end() - start, self.clean("".join(parts))
+                    parts = []
+                    start = seg = pos = m.end()
+                else:
+                    e = buf.find("*/", m.end())
+                    if e < 0:
+                        # the comment ends in the next chunk
+                        pos = m.start()
+                        break
+                    parts.append(buf[seg:m.start()])
+                    seg = pos = e + 2
+        if own:
+            f.close()
+
+    def clean(self, statement):
+        "removes line breaks and surrounding spaces from a statement"
+        if "\n" in statement:
+            statement = statement.replace("\r", "").replace("\n", "")
+        return statement.strip()
+
+    def parseRecord(self, statement):
+        """
+        Splits an entity statement like #12=IFCWALL(...) into
+        (id, type, attributes), or returns None if it is malformed
+        """
+        eq = statement.find("=")
+        par = statement.find("(", eq)
+        end = statement.rfind(")")
+        if (eq < 0) or (par < 0) or (end < par):
+            if DEBUG: print "malformed record: ", statement
+            return None
+        try:
+            id = int(statement[1:eq])
+        except ValueError:
+            if DEBUG: print "malformed record: ", statement
+            return None
+        return (id, statement[eq+1:par].strip().upper(), statement[par+1:end])
+
+    def readRecord(self, id):
+        "reads the record with the given id back from the file, using the index"
+        if not id in self.index:
+            return None
+        offset, length = self.index[id]
+        if not self.file:
+            self.file = open(self.filename, "rb")
+        self.file.seek(offset)
+        for o, l, statement in self.statements(cStringIO.StringIO(self.file.read(length))):
+            return self.parseRecord(statement)
+        return None
+
+    def close(self):
+        "closes the file opened by readRecord"
+        if self.file:
+            self.file.close()
+            self.file = None
+
+def splitAttributes(attrs_str):
+    """
+    Maps the raw attributes of a record to python types in one pass, and
+    returns a list with one item per attribute. Lists are nested lists,
+    numbers are floats, strings are unquoted, $ is None, and references,
+    enums and typed values such as IFCLABEL('x') are kept as strings
+    """
+    stack = []
+    current = []
+    typed = None # tokens of a typed value
+    for t in STEP_ATTRIBUTE_RE.findall(attrs_str):
+        if typed:
+            typed.append(t)
+            if t == ")":
+                depth -= 1
+                if depth == 0:
+                    current.append("".join(typed))
+                    typed = None
+            elif t[-1] == "(":
+                depth += 1
+        elif t == ",":
+            continue
+        elif t == "(":
+            stack.append(current)
+            current = []
+        elif t == ")":
+            l = current
+            current = stack.pop()
+            current.append(l)
+        elif t[0] == "'":
+            current.append(t[1:-1])
+        elif t[-1] == "(":
+            typed = [t]
+            depth = 1
+        else:
+            try:
+                current.append(float(t)) # number, any kind
+            except ValueError:
+                if t == "$":
+                    current.append(None)
+                else:
+                    current.append(t) # ref, enum or other
+    return current
+
 class IfcFile:
     """
     Parses an ifc file given by filename, entities can be retrieved by name and id
-    The whole file is stored in a dictionary (in memory)
+    The whole file is stored in a dictionary (in memory). If lazy is True, only
+    the type and the position in the file of each entity are kept, and entities
+    are parsed again from the file when retrieved by id. The ids of the entities
+    referencing each entity are stored in the inverse dictionary
     """
     
     entsById = {}
     entsByName = {}
 
-    def __init__(self, filename,schema):
+    def __init__(self, filename,schema,lazy=False):
         self.filename = filename
-        self.schema = IfcSchema(schema)
-        self.file = open(self.filename)
+        self.schema = getSchema(schema)
+        self.lazy = lazy
+        self.inverse = {}
+        self.tokenizer = IfcTokenizer(self.filename)
         self.entById, self.entsByName, self.header = self.read()
-        self.file.close()
-        if DEBUG: print "Parsed from file %s: %s entities" % (self.filename, len(self.entById))
+        if DEBUG: print "Parsed from file %s: %s entities" % (self.filename, len(self.tokenizer.index))
     
     def getEntityById(self, id):
-        return self.entById.get(id, None)
+        e = self.entById.get(id, None)
+        if (e is None) and self.lazy:
+            record = self.tokenizer.readRecord(id)
+            if record:
+                id, name, attrs = record
+                e = {"id": id, "name": name, "attributes": self.parseAttributes(name, attrs)}
+        return e
     
     def getEntitiesByName(self, name):
         return self.entsByName.get(name, None)
 
+    def getReferencingIds(self, id):
+        return self.inverse.get(id, [])
+
     def read(self):
         """
-        Returns 2 dictionaries, entById and entsByName
+        Returns 2 dictionaries, entById and entsByName, and the header,
+        reading the file in one pass with the tokenizer
+        """
+        entById = {}
+        entsByName = {}
+        inverse = self.inverse
+        for id, name, attrs in self.tokenizer:
+            entsByName.setdefault(name,[]).append(id)
+            for ref in STEP_REFERENCE_RE.findall(attrs):
+                if ref:
+                    l = inverse.setdefault(int(ref),[])
+                    if not l or l[-1] != id:
+                        l.append(id)
+            if self.lazy:
+                # attributes are parsed on demand by getEntityById
+                continue
+            entById[id] = {"id": id, "name": name, "attributes": self.parseAttributes(name, attrs)}
+        return [entById, entsByName, self.tokenizer.header]
+
+    def readLines(self):
+        """
+        Same as read(), but parsing the file line by line. This is the
+        former reader, which fails on records spanning several lines,
+        kept for reference and benchmarking
         """
         entById = {}
         entsByName = {}
         header = 'HEADER '
         readheader = False
-        for line in self.file:
+        f = open(self.filename)
+        for line in f:
             e = self.parseLine(line)
             if e:
                 entById[int(e["id"])] = e
-                ids = e.get(e["name"],[])
-                ids.append(e["id"])
-                entsByName[e["name"]] = list(set(ids))
+                entsByName.setdefault(e["name"],[]).append(e["id"])
             elif 'HEADER' in line:
                 readheader = True
             elif readheader:
@@ -198,7 +516,7 @@ class IfcFile:
                     readheader = False
                 else:
                     header += line
-                    
+        f.close()
         return [entById, entsByName, header]
 
     def parseLine(self, line):
@@ -213,28 +531,31 @@ class IfcFile:
             attrs = attrs.strip()
         else:
             return False
-        
-        return {"id": id, "name": name, "attributes": self.parseAttributes(name, attrs)}
 
-    def parseAttributes(self, ent_name, attrs_str):
-        """
-        Parse the attributes of a line
-        """
         parts = []
         lastpos = 0
-        
-        while lastpos < len(attrs_str):
-            newpos = self.nextString(attrs_str, lastpos)
-            parts.extend(self.parseAttribute(attrs_str[lastpos:newpos-1]))
+        while lastpos < len(attrs):
+            newpos = self.nextString(attrs, lastpos)
+            parts.extend(self.parseAttribute(attrs[lastpos:newpos-1]))
             lastpos = newpos
-        
-        schema_attributes = self.schema.getAttributes(ent_name)
 
-        assert len(schema_attributes) == len(parts), \
+        return {"id": id, "name": name, "attributes": self.mapAttributes(name, parts)}
+
+    def parseAttributes(self, ent_name, attrs_str):
+        """
+        Parse the attributes of a record
+        """
+        return self.mapAttributes(ent_name, splitAttributes(attrs_str))
+
+    def mapAttributes(self, ent_name, parts):
+        """
+        Returns a dictionary of attribute name -> value
+        """
+        attribute_names = self.schema.getAttributeNames(ent_name)
+
+        assert len(attribute_names) == len(parts), \
             "Expected %s attributes, got %s (entity: %s" % \
-            (len(schema_attributes), len(parts), ent_name)
-        
-        attribute_names = [a[0] for a in schema_attributes]
+            (len(attribute_names), len(parts), ent_name)
         
         return dict(zip(attribute_names, parts))
 
@@ -299,6 +620,23 @@ class IfcEntity:
     def __repr__(self):
         return str(self.id) + ' : ' + self.type + ' ' + str(self.attributes)
 
+    def __getattr__(self,attr):
+        "attributes of entities from lazy documents are resolved when accessed"
+        lazyattrs = self.__dict__.get("lazyattributes")
+        if lazyattrs and (attr in lazyattrs):
+            return self.doc.__value__(lazyattrs[attr])
+        raise AttributeError(attr)
+
+    def __eq__(self,other):
+        # lazy documents can create the same entity more than once
+        return isinstance(other,IfcEntity) and (other.id == self.id) and (other.doc is self.doc)
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.id
+
     def getProperties(self):
         return self.doc.find('IFCRELDEFINESBYPROPERTIES','RelatedObjects',self)
 
@@ -327,16 +665,60 @@ class IfcEntity:
 
     def getAttribute(self,attr):
         "returns the value of the given attribute, if exists"
-        if hasattr(self,attr):
-            return self.__dict__[attr]
-        return None
+        return getattr(self,attr,None)
+
+class IfcEntityCache:
+    """
+    A dictionary-like container for the entities of a lazy IfcDocument.
+    Entities are created the first time they are accessed, and only the
+    most recently used ones are kept, up to the given size
+    """
+    def __init__(self,doc,size=CACHESIZE):
+        self.doc = doc
+        self.size = size
+        self.entities = collections.OrderedDict()
+
+    def __getitem__(self,id):
+        if id == 0:
+            return self.doc.file.header
+        try:
+            ent = self.entities.pop(id)
+        except KeyError:
+            ent = self.doc.__load__(id)
+            if len(self.entities) >= self.size:
+                self.entities.popitem(last=False)
+        self.entities[id] = ent
+        return ent
+
+    def __contains__(self,id):
+        return (id == 0) or (id in self.doc.file.tokenizer.index)
+
+    def __len__(self):
+        return len(self.doc.file.tokenizer.index) + 1
+
+    def keys(self):
+        return [0] + sorted(self.doc.file.tokenizer.index.keys())
+
+    def iteritems(self):
+        for k in self.keys():
+            yield k, self[k]
             
 class IfcDocument:
-    "an object representing an IFC document"
-    def __init__(self,filename,schema="IFC2X3_TC1.exp"):
-        f = IfcFile(filename,schema)
+    """
+    an object representing an IFC document. If lazy is True, entities are only
+    created when retrieved with getEnt() or accessed through an attribute of
+    another entity, and at most cachesize entities are kept in memory
+    """
+    def __init__(self,filename,schema="IFC2X3_TC1.exp",lazy=False,cachesize=CACHESIZE):
+        f = IfcFile(filename,schema,lazy)
         self.filename = filename
+        self.lazy = lazy
+        self.file = f
         self.data = f.entById
+        if lazy:
+            self.Entities = IfcEntityCache(self,cachesize)
+            if DEBUG: print "Lazy document successfully created"
+            return
         self.Entities = {0:f.header}
         for k,e in self.data.iteritems():
             eid = int(e['id'])
@@ -347,20 +729,36 @@ class IfcDocument:
             if hasattr(ent,"attributes"):
                 for k,v in ent.attributes.iteritems():
                     if DEBUG: print "parsing attribute: ",k," value ",v
-                    if isinstance(v,str):
-                        val = self.__clean__(v)
-                    elif isinstance(v,list):
-                        val = []
-                        for item in v:
-                            if isinstance(item,str):
-                                val.append(self.__clean__(item))
-                            else:
-                                val.append(item)
-                    else:
-                        val = v
-                    setattr(ent,k.strip(),val)
+                    setattr(ent,k.strip(),self.__value__(v))
         if DEBUG: print "Document successfully created"
 
+    def close(self):
+        "closes the file kept open by lazy documents to read entities"
+        self.file.tokenizer.close()
+
+    def __load__(self,id):
+        "creates the entity with the given id from the file, for lazy documents"
+        e = self.file.getEntityById(id)
+        if not e:
+            raise KeyError(id)
+        ent = IfcEntity(e,self)
+        ent.lazyattributes = dict([(k.strip(),v) for k,v in ent.attributes.iteritems()])
+        return ent
+
+    def __value__(self,value):
+        "turns a raw attribute value, or a list of values, into something usable"
+        if isinstance(value,str):
+            return self.__clean__(value)
+        elif isinstance(value,list):
+            val = []
+            for item in value:
+                if isinstance(item,str):
+                    val.append(self.__clean__(item))
+                else:
+                    val.append(item)
+            return val
+        return value
+
     def __clean__(self,value):
         "turns an attribute value into something usable"
         try:
@@ -403,30 +801,50 @@ class IfcDocument:
     def __repr__(self):
         return "IFC Document: " + self.filename + ', ' + str(len(self.Entities)) + " entities "
 
-    def getEnt(self,ref):
-        "gets an entity by id number, or a list of entities by type"
+    def getEnt(self,ref,subtypes=False):
+        """
+        gets an entity by id number, or a list of entities by type. If
+        subtypes is True, entities of all the subtypes of the given type
+        are returned too
+        """
         if isinstance(ref,int):
             if ref in self.Entities:
                 return self.Entities[ref]
         elif isinstance(ref,str):
+            if subtypes:
+                names = self.file.schema.getSubtypes(ref)
+            else:
+                names = [ref.upper()]
             l = []
-            ref = ref.upper()
-            for k,ob in self.Entities.iteritems():
-                if hasattr(ob,"type"):
-                    if ob.type == ref:
-                        l.append(ob)
+            for n in names:
+                for k in self.file.entsByName.get(n,[]):
+                    l.append(self.Entities[k])
             return l
         return None
 
+    def getInverse(self,ref,ifctype=None):
+        """
+        returns the entities that reference the given entity (or entity id),
+        optionally only those of the given type
+        """
+        if isinstance(ref,IfcEntity):
+            ref = ref.id
+        if ifctype:
+            ifctype = ifctype.upper()
+        l = []
+        for k in self.file.getReferencingIds(ref):
+            ob = self.Entities[k]
+            if (not ifctype) or (ob.type == ifctype):
+                l.append(ob)
+        return l
+
     def search(self,pat):
         "searches entities types for partial match"
         l = []
         pat = pat.upper()
-        for k,ob in self.Entities.iteritems():
-            if hasattr(ob,"type"):
-                if pat in ob.type:
-                    if not ob.type in l:
-                        l.append(ob.type)
+        for t in self.file.entsByName.keys():
+            if pat in t:
+                l.append(t)
         return l
 
     def find(self,pat1,pat2=None,pat3=None):
@@ -434,14 +852,19 @@ class IfcDocument:
         arguments can be of the following form:
         - (pattern): returns object types matching the given pattern (same as search)
         - (type,property,value): finds, in all objects of type "type", those whose
-          property "property" has the given value
+          property "property" has the given value, or contains it if it is a list
         '''
         if pat3:
-            bobs = self.getEnt(pat1)
+            if isinstance(pat3,IfcEntity):
+                # only look at the entities referencing pat3
+                bobs = self.getInverse(pat3,pat1)
+            else:
+                bobs = self.getEnt(pat1)
             obs = []
             for bob in bobs:
                 if hasattr(bob,pat2):
-                    if bob.getAttribute(pat2) == pat3:
+                    v = bob.getAttribute(pat2)
+                    if (v == pat3) or (isinstance(v,list) and (pat3 in v)):
                         obs.append(bob)
             return obs
         elif pat1:
@@ -456,7 +879,7 @@ def explorer(filename,schema="IFC2X3_TC1.exp"):
     "returns a PySide dialog showing the contents of an IFC file"
     from PySide import QtCore,QtGui
     ifc = IfcDocument(filename,schema)
-    schema = IfcSchema(schema)
+    schema = getSchema(schema)
     tree = QtGui.QTreeWidget()
     tree.setColumnCount(3)
     tree.setWordWrap(True)
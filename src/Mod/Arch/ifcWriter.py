@@ -392,15 +392,34 @@ class IfcDocument(object):
         return elt
 
     def addRepresentations(self,shapes):
-        """addRepresentations(shapes,[solidType]): creates a representation from the given shape"""
+        """addRepresentations(shapes,[solidType]): creates a representation from the given shape,
+        or from a representation map created with addRepresentationMap()"""
         solidType = "Brep"
         if not isinstance(shapes,list):
             if shapes.is_a("IfcExtrudedAreaSolid"):
                 solidType = "SweptSolid"
+            elif shapes.is_a("IfcRepresentationMap"):
+                return [self.addMappedItem(shapes)]
             shapes = [shapes]
         reps = [create(self._fileobject,"IfcShapeRepresentation",[self._repcontext,'Body',solidType,[shape for shape in shapes]])]
         return reps
 
+    def addRepresentationMap(self,shapes):
+        """addRepresentationMap(shapes): creates a representation map from the given shapes, which
+        can then be passed instead of shapes to addProduct() to share the same geometry between
+        several products"""
+        rep = self.addRepresentations(shapes)[0]
+        origin = self.addPlacement(local=False)
+        return create(self._fileobject,"IfcRepresentationMap",[origin,rep])
+
+    def addMappedItem(self,repmap):
+        """addMappedItem(repmap): creates a representation instancing the given representation map"""
+        if not hasattr(self,"_identity"):
+            ovc = create(self._fileobject,"IfcCartesianPoint",getTuple((0,0,0)))
+            self._identity = create(self._fileobject,"IfcCartesianTransformationOperator3D",[None,None,ovc,1.0,None])
+        item = create(self._fileobject,"IfcMappedItem",[repmap,self._identity])
+        return create(self._fileobject,"IfcShapeRepresentation",[self._repcontext,'Body','MappedRepresentation',[item]])
+
     def addColor(self,rgb,rep):
         """addColor(rgb,rep): adds a RGB color definition tuple (float,float,float) to a given representation"""
         col = create(self._fileobject,"IfcColourRgb",[None]+list(rgb))
@@ -518,16 +537,12 @@ class IfcDocument(object):
         for f in face:
             pts = []
             for p in f:
-                #print p
                 if p in self.fpoints:
-                    #print self.fpoints.index(p)
-                    #print self.frefs
-                    pts.append(self.frefs[self.fpoints.index(p)])
+                    pts.append(self.fpoints[p])
                 else:
                     pt = create(self._fileobject,"IfcCartesianPoint",getTuple(p))
                     pts.append(pt)
-                    self.fpoints.append(p)
-                    self.frefs.append(pt)
+                    self.fpoints[p] = pt
             #print pts
             loop = create(self._fileobject,"IfcPolyLoop",[pts])
             if idx == 0:
@@ -542,8 +557,7 @@ class IfcDocument(object):
     def addFacetedBrep(self,faces,color=None):
         """addFacetedBrep(self,faces,[color]): creates a faceted brep object from the given list
         of faces (each face is a list of lists of points, inner wires are reversed)"""
-        self.fpoints = []
-        self.frefs = []
+        self.fpoints = {} # point tuple: IfcCartesianPoint
         #print "adding ",len(faces)," faces"
         #print faces
         ifaces = [self.addFace(face) for face in faces]
@@ -34,6 +34,12 @@ SCHEMA = "http://www.steptools.com/support/stdev_docs/ifcbim/ifc4.exp" # only fo
 MAKETEMPFILES = False # if True, shapes are passed from ifcopenshell to freecad through temp files
 DEBUG = True # this is only for the python console, this value is overridden when importing through the GUI
 SKIP = ["IfcBuildingElementProxy","IfcFlowTerminal","IfcFurnishingElement"] # default. overwritten by the GUI options
+LAZY_PARSER = False # if True, the internal parser only creates entities when they are needed
+LAZY_CACHE_SIZE = 10000 # max number of entities kept in memory by the lazy parser
+IMPORT_WORKERS = 0 # number of processes building shapes with IfcOpenShell. 0 or 1 = no parallel processing
+WORKER_CHUNKSIZE = 20 # number of shapes sent to a worker process at once
+BULK_IMPORT = False # if True, links between objects are made in one batch, and the GUI is not refreshed during import
+TESSELLATION_CACHE_SIZE = 1000 # max number of tessellated solids kept between exports
 # end config
 
 # supported ifc products (export only):
@@ -73,6 +79,7 @@ def insert(filename,docname,skip=None):
 def getConfig():
     "Gets Arch IFC import preferences"
     global SKIP, CREATE_IFC_GROUPS, ASMESH, PREFIX_NUMBERS, FORCE_PYTHON_PARSER, SEPARATE_OPENINGS, SEPARATE_PLACEMENTS, JOINSOLIDS, AGGREGATE_WINDOWS
+    global LAZY_PARSER, LAZY_CACHE_SIZE, IMPORT_WORKERS, BULK_IMPORT
     IMPORT_IFC_FURNITURE = False
     ASMESH = ["IfcFurnishingElement"]
     p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch")
@@ -84,6 +91,10 @@ def getConfig():
     PREFIX_NUMBERS = p.GetBool("ifcPrefixNumbers",False)
     JOINSOLIDS = p.GetBool("ifcJoinSolids",False)
     AGGREGATE_WINDOWS = p.GetBool("ifcAggregateWindows",False)
+    LAZY_PARSER = p.GetBool("ifcLazyParser",False)
+    LAZY_CACHE_SIZE = p.GetInt("ifcLazyCacheSize",10000)
+    IMPORT_WORKERS = p.GetInt("ifcImportWorkers",0)
+    BULK_IMPORT = p.GetBool("ifcBulkImport",False)
     skiplist = p.GetString("ifcSkip","")
     if skiplist:
         SKIP = skiplist.split(",")
@@ -112,13 +123,97 @@ def getIfcOpenShell():
             IFCOPENSHELL5 = True
         return True
 
+class PhaseTimer:
+    "records the time spent in each phase of an import"
+    def __init__(self):
+        self.phases = []
+        self.last = time.time()
+
+    def end(self,name):
+        "ends the current phase, giving it a name"
+        t = time.time()
+        self.phases.append([name,t-self.last])
+        self.last = t
+
+    def report(self,count=None):
+        "prints the time spent in each phase, and the number of created objects"
+        if count != None:
+            FreeCAD.Console.PrintMessage(str(count)+" objects created\n")
+        for name,t in self.phases:
+            FreeCAD.Console.PrintMessage("    %s: %.3f s\n" % (name,t))
+
+class BulkLinker:
+    """collects the additions and subtractions made during an import, so each host
+    is modified only once, and keeps the main window from being redrawn until
+    finish() is called"""
+    def __init__(self):
+        self.hosts = {} # host name: [host, additions, subtractions]
+        self.mainwindow = None
+        if FreeCAD.GuiUp:
+            try:
+                import FreeCADGui
+                self.mainwindow = FreeCADGui.getMainWindow()
+                self.mainwindow.setUpdatesEnabled(False)
+            except:
+                self.mainwindow = None
+
+    def add(self,obj,host):
+        "registers obj to be added to host"
+        self.hosts.setdefault(host.Name,[host,[],[]])[1].append(obj)
+
+    def remove(self,obj,host):
+        "registers obj to be subtracted from host"
+        self.hosts.setdefault(host.Name,[host,[],[]])[2].append(obj)
+
+    def flush(self):
+        "makes all the registered links, components first, then floors, buildings and sites"
+        import ArchCommands
+        order = ["Floor","Building","Site"]
+        hosts = self.hosts.values()
+        hosts.sort(key=lambda h: order.index(Draft.getType(h[0]))+1 if Draft.getType(h[0]) in order else 0)
+        for host,additions,subtractions in hosts:
+            if additions:
+                if DEBUG: print "adding ",len(additions)," objects to ",host.Name
+                ArchCommands.addComponents(additions,host)
+            if subtractions:
+                if DEBUG: print "removing ",len(subtractions)," objects from ",host.Name
+                ArchCommands.removeComponents(subtractions,host)
+        self.hosts = {}
+
+    def finish(self):
+        "lets the main window redraw again"
+        if self.mainwindow:
+            self.mainwindow.setUpdatesEnabled(True)
+            self.mainwindow.update()
+            self.mainwindow = None
+
 def read(filename,skip=None):
     "Parses an IFC file"
 
+    timer = PhaseTimer()
+    numobjects = len(FreeCAD.ActiveDocument.Objects)
+    bulk = None
+    if BULK_IMPORT and getIfcOpenShell() and not FORCE_PYTHON_PARSER:
+        bulk = BulkLinker()
+    try:
+        done = readObjects(filename,skip,timer,bulk)
+    finally:
+        if bulk:
+            bulk.finish()
+            timer.end("redrawing")
+    if done and (DEBUG or BULK_IMPORT):
+        timer.report(len(FreeCAD.ActiveDocument.Objects)-numobjects)
+    return None
+
+def readObjects(filename,skip,timer,bulk=None):
+    """creates the objects found in an IFC file, recording the time spent in each
+    phase in timer. If a BulkLinker is given, the relationships are made through it.
+    Returns True if the file could be read"""
+
     # parsing the IFC file
     t1 = time.time()
     
-    processedIds = []
+    processedIds = set()
     skipIds = skip
     if not skipIds:
         skipIds = []
@@ -158,12 +253,38 @@ def read(filename,skip=None):
             relations = ifc.by_type("IfcRelAggregates") + ifc.by_type("IfcRelContainedInSpatialStructure") + ifc.by_type("IfcRelVoidsElement")
             if not objects:
                 print "Error opening IFC file"
-                return 
+                return False
+            timer.end("opening file")
+            # a table to relate ifc id with [parent id, additive] pairs, built from the relations
+            relParents = {}
+            for r in relations:
+                if r.is_a("IfcRelAggregates"):
+                    p = getId(getAttr(r,"RelatingObject"))
+                    for c in getAttr(r,"RelatedObjects"):
+                        relParents.setdefault(getId(c),[]).append([p,True])
+                elif r.is_a("IfcRelContainedInSpatialStructure"):
+                    p = getId(getAttr(r,"RelatingStructure"))
+                    for c in getAttr(r,"RelatedElements"):
+                        relParents.setdefault(getId(c),[]).append([p,True])
+                elif r.is_a("IfcRelVoidsElement"):
+                    p = getId(getAttr(r,"RelatingBuildingElement"))
+                    relParents.setdefault(getId(getAttr(r,"RelatedOpeningElement")),[]).append([p,False])
+            timer.end("indexing relations")
+            brepCache.clear()
+            if useShapes and (IMPORT_WORKERS > 1):
+                ids = []
+                for o in objects:
+                    oid = getId(o)
+                    if (not oid in skipIds) and (not str(o).split("=")[1].split("(")[0] in SKIP):
+                        ids.append(oid)
+                buildShapes(ids,IMPORT_WORKERS)
+                timer.end("building shapes in "+str(IMPORT_WORKERS)+" processes")
         else:
             num_lines = sum(1 for line in pyopen(filename))
             if not IfcImport.Init(filename):
                 print "Error opening IFC file"
-                return
+                return False
+            timer.end("opening file")
                 
         # processing geometry
         idx = 0
@@ -172,21 +293,10 @@ def read(filename,skip=None):
             if IFCOPENSHELL5:
                 obj = objects[idx]
                 idx += 1
-                objid = int(str(obj).split("=")[0].strip("#"))
+                objid = getId(obj)
                 objname = obj.get_argument(obj.get_argument_index("Name"))
                 objtype = str(obj).split("=")[1].split("(")[0]
-                for r in relations:
-                    if r.is_a("IfcRelAggregates"):
-                        for c in getAttr(r,"RelatedObjects"):
-                            if str(obj) == str(c):
-                                objparentid.append(int(str(getAttr(r,"RelatingObject")).split("=")[0].strip("#")))
-                    elif r.is_a("IfcRelContainedInSpatialStructure"):
-                        for c in getAttr(r,"RelatedElements"):
-                            if str(obj) == str(c):
-                                objparentid.append(int(str(getAttr(r,"RelatingStructure")).split("=")[0].strip("#")))
-                    elif r.is_a("IfcRelVoidsElement"):
-                        if str(obj) == str(getAttr(r,"RelatedOpeningElement")):
-                            objparentid.append(int(str(getAttr(r,"RelatingBuildingElement")).split("=")[0].strip("#")))
+                objparentid = relParents.get(objid,[])
                     
             else:
                 if hasattr(IfcImport, 'GetBrepData'):
@@ -197,7 +307,7 @@ def read(filename,skip=None):
                 idx = objid
                 objname = obj.name
                 objtype = obj.type
-                objparentid.append(obj.parent_id)
+                objparentid.append([obj.parent_id,True])
             if DEBUG: print "["+str(int((float(idx)/num_lines)*100))+"%] parsing ",objid,": ",objname," of type ",objtype
 
             # retrieving name
@@ -286,10 +396,10 @@ def read(filename,skip=None):
                 # registering object number and parent
                 if objparentid:
                     ifcParents[objid] = []
-                    for p in objparentid:
-                        ifcParents[objid].append([p,not (objtype in subtractiveTypes)])
+                    for p,additive in objparentid:
+                        ifcParents[objid].append([p,additive and not (objtype in subtractiveTypes)])
                 ifcObjects[objid] = nobj
-                processedIds.append(objid)
+                processedIds.add(objid)
             
             if IFCOPENSHELL5:
                 if idx >= len(objects):
@@ -297,7 +407,7 @@ def read(filename,skip=None):
             else:
                 if not IfcImport.Next():
                     break
-
+        timer.end("building objects")
 
         # processing non-geometry and relationships
         parents_temp = dict(ifcParents)
@@ -368,11 +478,21 @@ def read(filename,skip=None):
                 if parent and (id in ifcObjects):
                     if ifcObjects[id] and (ifcObjects[id].Name != parent.Name):
                         if additive:
-                            if DEBUG: print "adding ",ifcObjects[id].Name, " to ",parent.Name
-                            ArchCommands.addComponents(ifcObjects[id],parent)
+                            if bulk:
+                                bulk.add(ifcObjects[id],parent)
+                            else:
+                                if DEBUG: print "adding ",ifcObjects[id].Name, " to ",parent.Name
+                                ArchCommands.addComponents(ifcObjects[id],parent)
                         else:
-                            if DEBUG: print "removing ",ifcObjects[id].Name, " from ",parent.Name
-                            ArchCommands.removeComponents(ifcObjects[id],parent)
+                            if bulk:
+                                bulk.remove(ifcObjects[id],parent)
+                            else:
+                                if DEBUG: print "removing ",ifcObjects[id].Name, " from ",parent.Name
+                                ArchCommands.removeComponents(ifcObjects[id],parent)
+        timer.end("processing relationships")
+        if bulk:
+            bulk.flush()
+            timer.end("linking objects")
         if not IFCOPENSHELL5:
             IfcImport.CleanUp()
         
@@ -384,44 +504,51 @@ def read(filename,skip=None):
         if schema:
             if DEBUG: print "opening",filename,"..."
             ifcReader.DEBUG = DEBUG
-            ifc = ifcReader.IfcDocument(filename,schema=schema)
+            ifc = ifcReader.IfcDocument(filename,schema=schema,lazy=LAZY_PARSER,cachesize=LAZY_CACHE_SIZE)
         else:
             FreeCAD.Console.PrintWarning(translate("Arch","IFC Schema not found, IFC import disabled.\n"))
-            return None
+            return False
         t2 = time.time()
         if DEBUG: print "Successfully loaded",ifc,"in %s s" % ((t2-t1))
+        timer.end("opening file")
        
-        # getting walls
-        for w in ifc.getEnt("IfcWallStandardCase"):
-            nobj = makeWall(w)
+        try:
+            # getting walls
+            for w in ifc.getEnt("IfcWallStandardCase"):
+                nobj = makeWall(w)
             
-        # getting windows and doors
-        for w in (ifc.getEnt("IfcWindow") + ifc.getEnt("IfcDoor")):
-            nobj = makeWindow(w)
+            # getting windows and doors
+            for w in (ifc.getEnt("IfcWindow") + ifc.getEnt("IfcDoor")):
+                nobj = makeWindow(w)
             
-        # getting structs
-        for w in (ifc.getEnt("IfcSlab") + ifc.getEnt("IfcBeam") + ifc.getEnt("IfcColumn") \
-                  + ifc.getEnt("IfcFooting")):
-            nobj = makeStructure(w)
+            # getting structs
+            for w in (ifc.getEnt("IfcSlab") + ifc.getEnt("IfcBeam") + ifc.getEnt("IfcColumn") \
+                      + ifc.getEnt("IfcFooting")):
+                nobj = makeStructure(w)
              
-        # getting floors
-        for f in ifc.getEnt("IfcBuildingStorey"):
-            group(f,ifc,"Floor")
+            # getting floors
+            for f in ifc.getEnt("IfcBuildingStorey"):
+                group(f,ifc,"Floor")
             
-        # getting buildings
-        for b in ifc.getEnt("IfcBuilding"):
-            group(b,ifc,"Building")
+            # getting buildings
+            for b in ifc.getEnt("IfcBuilding"):
+                group(b,ifc,"Building")
             
-        # getting sites
-        for s in ifc.getEnt("IfcSite"):
-            group(s,ifc,"Site")
+            # getting sites
+            for s in ifc.getEnt("IfcSite"):
+                group(s,ifc,"Site")
+        finally:
+            # lazy documents keep the file open to read entities
+            ifc.close()
+        timer.end("building objects")
 
     if DEBUG: print "done parsing. Recomputing..."        
     FreeCAD.ActiveDocument.recompute()
+    timer.end("recomputing")
     t3 = time.time()
     if DEBUG: print "done processing IFC file in %s s" % ((t3-t1))
     
-    return None
+    return True
 
 
 def getCleanName(name,ifcid,ifctype):
@@ -652,13 +779,59 @@ def getMesh(obj):
     pl = FreeCAD.Placement(mat)
     return me,pl
 
+brepCache = {} # brep strings already built by worker processes, by ifc id
+
+def buildShapes(ids,workers):
+    """builds the shapes of the given ifc ids in several processes, and stores the
+    resulting brep strings in brepCache. Only available where processes are forked"""
+    if sys.platform.startswith("win"):
+        if DEBUG: print "Parallel shape building not supported on this platform"
+        return
+    import multiprocessing
+    chunks = [ids[i:i+WORKER_CHUNKSIZE] for i in range(0,len(ids),WORKER_CHUNKSIZE)]
+    pool = None
+    done = False
+    try:
+        pool = multiprocessing.Pool(workers)
+        for result in pool.imap_unordered(buildBreps,chunks):
+            for objid,brep_data in result:
+                if brep_data:
+                    brepCache[objid] = brep_data
+        pool.close()
+        done = True
+    except Exception:
+        print "Error in parallel shape building, remaining shapes will be built serially"
+    finally:
+        if pool:
+            if not done:
+                pool.terminate()
+            pool.join()
+    if DEBUG: print len(brepCache),"shapes built in",workers,"processes"
+
+def buildBreps(ids):
+    "runs in a worker process: returns [id, brep string] pairs for the given ifc ids"
+    result = []
+    for objid in ids:
+        try:
+            sh = getShape(ifc.by_id(objid),objid)
+        except:
+            sh = None
+        if sh:
+            result.append([objid,sh.exportBrepToString()])
+        else:
+            result.append([objid,None])
+    return result
+
 def getShape(obj,objid):
     "gets a shape from an IfcOpenShell object"
     #print "retrieving shape from obj ",objid
     import Part
     sh=Part.Shape()
     brep_data = None
-    if IFCOPENSHELL5:
+    if IFCOPENSHELL5 and (objid in brepCache):
+        # already built and fixed by a worker process
+        brep_data = brepCache.pop(objid)
+    elif IFCOPENSHELL5:
         try:
             if hasattr(IfcImport,"SEW_SHELLS"):
                 ss = IfcImport.SEW_SHELLS
@@ -765,6 +938,12 @@ def getPlacement(entity):
     if DEBUG: print "    made placement for ",entityid,":",pl
     return pl
     
+def getId(entity):
+    "returns the id number of the given IfcOpenShell entity"
+    if callable(getattr(entity,"id",None)):
+        return entity.id()
+    return int(str(entity).split("=")[0].strip("#"))
+
 def getAttr(entity,attr):
     "returns the given attribute from the given entity"
     if IFCOPENSHELL5:
@@ -951,6 +1130,7 @@ def export(exportList,filename):
     scaling = p.GetFloat("IfcScalingFactor",1.0)
     exporttxt = p.GetBool("IfcExportList",False)
     forcebrep = p.GetBool("ifcExportAsBrep",False)
+    sharegeometry = p.GetBool("ifcShareGeometry",True)
     application = "FreeCAD"
     ver = FreeCAD.Version()
     version = ver[0]+"."+ver[1]+" build"+ver[2]
@@ -987,6 +1167,10 @@ def export(exportList,filename):
     global unprocessed
     unprocessed = []
 
+    # objects exported as breps with the same geometry as a previous one are
+    # exported once as a representation map and instanced with a mapped item
+    sharedreps = {} # geometry key: IfcRepresentationMap, or None if seen once
+
     # process objects
     for obj in objectslist:
 
@@ -998,6 +1182,7 @@ def export(exportList,filename):
         placement = None
         color = None
         representation = None
+        shared = None
         descr = None
         extra = None
             
@@ -1050,7 +1235,21 @@ def export(exportList,filename):
             if (not forcebrep) and (not brepflag):
                 gdata = getIfcExtrusionData(obj,scaling,SEPARATE_OPENINGS)
                 #if DEBUG: print "   extrusion data for ",obj.Label," : ",gdata
-            if not gdata:
+            if (not gdata) and sharegeometry:
+                # the first object with a given geometry is exported as a normal brep,
+                # the map is created when the same geometry is met again
+                key = getShapeKey(obj.Shape,color)
+                if key and (key in sharedreps):
+                    if not sharedreps[key]:
+                        fdata = getIfcBrepFacesData(obj,scaling,local=True)
+                        if fdata:
+                            sharedreps[key] = ifc.addRepresentationMap([ifc.addFacetedBrep(f, color=color) for f in fdata])
+                    shared = sharedreps[key]
+                elif key:
+                    sharedreps[key] = None
+            if shared:
+                if DEBUG: print "   Shared brep"
+            elif not gdata:
                 fdata = getIfcBrepFacesData(obj,scaling)
                 #if DEBUG: print "   brep data for ",obj.Label," : ",fdata
                 if not fdata:
@@ -1077,6 +1276,10 @@ def export(exportList,filename):
                     representation = ifc.addExtrudedCompositeCurve(gdata[1], gdata[2], color=color)
                 else:
                     print "debug: unknow extrusion type"
+            elif shared:
+                pl = obj.Shape.Placement
+                placement = ifc.addPlacement(origin=DraftVecUtils.scale(pl.Base,scaling),xaxis=pl.Rotation.multVec(FreeCAD.Vector(1,0,0)),zaxis=pl.Rotation.multVec(FreeCAD.Vector(0,0,1)))
+                representation = shared
             elif fdata:
                 representation = [ifc.addFacetedBrep(f, color=color) for f in fdata]
 
@@ -1307,12 +1510,27 @@ def getIfcExtrusionData(obj,scale=1,nosubs=False):
                     return "polyline", getTuples(p,scale), getTuples(v,scale), d
     return None   
     
-def getIfcBrepFacesData(obj,scale=1,sub=False,tessellation=1):
-    """getIfcBrepFacesData(obj,[scale,tesselation]): returns a list(0) of lists(1) of lists(2) of lists(3), 
+def getShapeKey(shape,color=None):
+    """getShapeKey(shape,[color]): returns a key identifying the geometry of a shape
+    independently of its placement, so objects with the same key can share their
+    representation. Returns None if the shape is not usable."""
+    if (not shape) or shape.isNull() or (not shape.Solids):
+        return None
+    import hashlib
+    sh = shape.copy()
+    sh.Placement = FreeCAD.Placement()
+    prec = Draft.precision()
+    data = [len(sh.Solids),len(sh.Faces),len(sh.Edges),round(sh.Volume,prec),color]
+    data.extend(sorted([(round(v.X,prec),round(v.Y,prec),round(v.Z,prec)) for v in sh.Vertexes]))
+    return hashlib.md5(repr(data)).hexdigest()
+
+def getIfcBrepFacesData(obj,scale=1,sub=False,tessellation=1,local=False):
+    """getIfcBrepFacesData(obj,[scale,tesselation,local]): returns a list(0) of lists(1) of lists(2) of lists(3), 
     list(3) being a list of vertices defining a loop, list(2) describing a face from one or 
     more loops, list(1) being the whole solid made of several faces, list(0) being the list
     of solids inside the object. Scale can indicate a scaling factor. Tesselation is the tesselation
-    factor to apply on curved faces."""
+    factor to apply on curved faces. If local is True, the coordinates are given relatively to
+    the placement of the shape."""
     shape = None
     if sub:
         if hasattr(obj,"Proxy"):
@@ -1324,23 +1542,21 @@ def getIfcBrepFacesData(obj,scale=1,sub=False,tessellation=1):
                 if not obj.Shape.isNull():
                     if obj.Shape.isValid():
                         shape = obj.Shape
+    if shape and local:
+        shape = shape.copy()
+        shape.Placement = FreeCAD.Placement()
     if shape:
         import Part
         sols = []
         for sol in shape.Solids:
             s = []
             curves = False
-            for face in sol.Faces:
-                for e in face.Edges:
-                    if not isinstance(e.Curve,Part.Line):
-                        curves = True
+            for e in sol.Edges:
+                if not isinstance(e.Curve,Part.Line):
+                    curves = True
+                    break
             if curves:
-                tris = sol.tessellate(tessellation)
-                for tri in tris[1]:
-                    f = []
-                    for i in tri:
-                        f.append(getTuples(tris[0][i],scale))
-                    s.append([f])
+                s = getTessellatedFaces(sol,scale,tessellation)
             else:
                 for face in sol.Faces:
                     f = []
@@ -1353,6 +1569,49 @@ def getIfcBrepFacesData(obj,scale=1,sub=False,tessellation=1):
         return sols
     return None
     
+tessellationCache = {} # tessellated faces, by solid key
+
+def getTessellatedFaces(sol,scale=1,tessellation=1):
+    """getTessellatedFaces(sol,[scale,tessellation]): returns the faces of a tessellated
+    solid in the format of getIfcBrepFacesData, each face being made of one triangular loop.
+    Results are cached, so unchanged solids are not tessellated again on the next export."""
+    prec = Draft.precision()
+    b = sol.BoundBox
+    key = (sol.hashCode(),round(sol.Volume,prec),round(sol.Area,prec),
+           round(b.XMin,prec),round(b.YMin,prec),round(b.ZMin,prec),
+           round(b.XMax,prec),round(b.YMax,prec),round(b.ZMax,prec),tessellation,scale,prec)
+    if key in tessellationCache:
+        return tessellationCache[key]
+    verts,tris = sol.tessellate(tessellation)
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy and verts and tris:
+        # scale and round all vertices at once, then merge the ones that became
+        # identical and drop the triangles that collapsed
+        pts = numpy.round(numpy.array([(v.x,v.y,v.z) for v in verts])*scale,prec)
+        pts = [tuple(p) for p in pts.tolist()]
+        index = {}
+        remap = numpy.array([index.setdefault(p,i) for i,p in enumerate(pts)])
+        tris = remap[numpy.array(tris)]
+        tris = tris[(tris[:,0] != tris[:,1]) & (tris[:,1] != tris[:,2]) & (tris[:,0] != tris[:,2])]
+        faces = [[[pts[i],pts[j],pts[k]]] for i,j,k in tris.tolist()]
+    else:
+        # same rounding, merging and filtering, one vertex at a time
+        pts = [(round(v.x*scale,prec),round(v.y*scale,prec),round(v.z*scale,prec)) for v in verts]
+        index = {}
+        remap = [index.setdefault(p,i) for i,p in enumerate(pts)]
+        faces = []
+        for tri in tris:
+            i,j,k = [remap[n] for n in tri]
+            if (i != j) and (j != k) and (i != k):
+                faces.append([[pts[i],pts[j],pts[k]]])
+    if len(tessellationCache) >= TESSELLATION_CACHE_SIZE:
+        tessellationCache.clear()
+    tessellationCache[key] = faces
+    return faces
+
 def getIfcElevation(obj):
     """getIfcElevation(obj): Returns the lowest height (Z coordinate) of this object"""
     if obj.isDerivedFrom("Part::Feature"):
@@ -2839,6 +2839,21 @@ class _DraftObject:
     def onChanged(self, obj, prop):
         pass 
 
+    def getCache(self,shapes,key):
+        """returns the elements built by the previous execution if it used the same
+        shapes and key, otherwise an empty dict. The shapes are kept so their
+        geometry can't be freed and their hash reused by other shapes."""
+        if hasattr(self,"cacheShapes") and (len(shapes) == len(self.cacheShapes)) and (self.cacheKey == key):
+            for s1,s2 in zip(shapes,self.cacheShapes):
+                if not s1.isSame(s2):
+                    break
+            else:
+                return self.cache
+        self.cacheShapes = shapes
+        self.cacheKey = key
+        self.cache = {}
+        return self.cache
+
 class _ViewProviderDraft:
     "The base class for Draft Viewproviders"
         
@@ -4292,6 +4307,28 @@ class _Shape2DView(_DraftObject):
             return Part.makeCompound(edges)
             #return DraftGeomUtils.cleanProjection(Part.makeCompound(edges))
 
+    def getCutCache(self,obj,onlysolids):
+        """returns the cut results of the previous execution if the section plane
+        and the projection mode didn't change, otherwise an empty dict. The cache
+        is then emptied, and refilled by getCachedCut."""
+        key = (obj.ProjectionMode,onlysolids,DraftVecUtils.tup(obj.Base.Placement.Base),obj.Base.Placement.Rotation.Q)
+        cache = {}
+        if hasattr(self,"cutCache") and (self.cutKey == key):
+            cache = self.cutCache
+        self.cutKey = key
+        self.cutCache = {}
+        return cache
+
+    def getCachedCut(self,cache,source):
+        """returns the list of cut shapes cached for source, a (name,index,shape) tuple,
+        or None if its shape changed since"""
+        if source[:2] in cache:
+            shape,cuts = cache[source[:2]]
+            if shape.isSame(source[2]):
+                self.cutCache[source[:2]] = (shape,cuts)
+                return cuts
+        return None
+
     def execute(self,obj):
         import DraftGeomUtils
         pl = obj.Placement
@@ -4305,53 +4342,83 @@ class _Shape2DView(_DraftObject):
                     objs = getGroupContents(obj.Base.Objects,walls=True)
                     objs = removeHidden(objs)
                     shapes = []
+                    sources = []
                     for o in objs:
                         if o.isDerivedFrom("Part::Feature"):
                             if onlysolids:
-                                shapes.extend(o.Shape.Solids)
+                                for i,sol in enumerate(o.Shape.Solids):
+                                    shapes.append(sol)
+                                    sources.append((o.Name,i,o.Shape))
                             else:
                                 shapes.append(o.Shape.copy())
+                                sources.append((o.Name,0,o.Shape))
                     cutp,cutv,iv =Arch.getCutVolume(obj.Base.Shape,shapes)
+                    if cutp:
+                        # cut plane, and a point on the side removed by cutv
+                        planept = cutp.Vertexes[0].Point
+                        planen = cutp.normalAt(0,0)
+                        cutside = cutv.BoundBox.Center.sub(planept).dot(planen)
+                    # the results are cached per object, and reused if neither the
+                    # object nor the section plane moved
+                    cache = self.getCutCache(obj,onlysolids)
                     cuts = []
                     if obj.ProjectionMode == "Solid":
-                        for sh in shapes:
-                            if cutv:
-                                if sh.Volume < 0:
-                                    sh.reverse()
-                                #if cutv.BoundBox.isIntersection(sh.BoundBox):
-                                #    c = sh.cut(cutv)
-                                #else:
-                                #    c = sh.copy()
-                                c = sh.cut(cutv)
-                                if onlysolids:
-                                    cuts.extend(c.Solids)
-                                else:
-                                    cuts.append(c)
-                            else:
-                                if onlysolids:
-                                    cuts.extend(sh.Solids)
+                        for sh,source in zip(shapes,sources):
+                            c = self.getCachedCut(cache,source)
+                            if c is None:
+                                c = []
+                                if cutv:
+                                    if sh.Volume < 0:
+                                        sh.reverse()
+                                    bb = sh.BoundBox
+                                    bb.enlarge(1)
+                                    if bb.isCutPlane(planept,planen):
+                                        r = sh.cut(cutv)
+                                    elif bb.Center.sub(planept).dot(planen)*cutside > 0:
+                                        # entirely on the removed side
+                                        r = None
+                                    else:
+                                        r = sh
+                                    if r:
+                                        if onlysolids:
+                                            c.extend(r.Solids)
+                                        else:
+                                            c.append(r)
                                 else:
-                                    cuts.append(sh.copy())
+                                    if onlysolids:
+                                        c.extend(sh.Solids)
+                                    else:
+                                        c.append(sh.copy())
+                                self.cutCache[source[:2]] = (source[2],c)
+                            cuts.extend(c)
                         comp = Part.makeCompound(cuts)
                         opl = FreeCAD.Placement(obj.Base.Placement)
                         proj = opl.Rotation.multVec(FreeCAD.Vector(0,0,1))
                         obj.Shape = self.getProjected(obj,comp,proj)
                     elif obj.ProjectionMode in ["Cutlines","Cutfaces"]:
-                        for sh in shapes:
-                            if sh.Volume < 0:
-                                sh.reverse()
-                            c = sh.section(cutp)
-                            if (obj.ProjectionMode == "Cutfaces") and (sh.ShapeType == "Solid"):
-                                try:
-                                    c = Part.Wire(DraftGeomUtils.sortEdges(c.Edges))
-                                except:
-                                    pass
-                                else:
-                                    try:
-                                        c = Part.Face(c)
-                                    except:
-                                        pass
-                            cuts.append(c)
+                        for sh,source in zip(shapes,sources):
+                            c = self.getCachedCut(cache,source)
+                            if c is None:
+                                c = []
+                                bb = sh.BoundBox
+                                bb.enlarge(1)
+                                if cutp and bb.isCutPlane(planept,planen):
+                                    if sh.Volume < 0:
+                                        sh.reverse()
+                                    r = sh.section(cutp)
+                                    if (obj.ProjectionMode == "Cutfaces") and (sh.ShapeType == "Solid"):
+                                        try:
+                                            r = Part.Wire(DraftGeomUtils.sortEdges(r.Edges))
+                                        except:
+                                            pass
+                                        else:
+                                            try:
+                                                r = Part.Face(r)
+                                            except:
+                                                pass
+                                    c.append(r)
+                                self.cutCache[source[:2]] = (source[2],c)
+                            cuts.extend(c)
                         comp = Part.makeCompound(cuts)
                         opl = FreeCAD.Placement(obj.Base.Placement)
                         comp.Placement = opl.inverse()
@@ -4407,6 +4474,7 @@ class _Array(_DraftObject):
         obj.addProperty("App::PropertyVector","IntervalZ","Draft","Distance and orientation of intervals in Z direction")
         obj.addProperty("App::PropertyVector","Center","Draft","Center point")
         obj.addProperty("App::PropertyAngle","Angle","Draft","Angle to cover with copies")
+        obj.addProperty("App::PropertyBool","Instancing","Draft","If True, copies share the geometry of the base object instead of duplicating it")
         obj.ArrayType = ['ortho','polar']
         obj.NumberX = 1
         obj.NumberY = 1
@@ -4417,6 +4485,7 @@ class _Array(_DraftObject):
         obj.IntervalZ = Vector(0,0,1)
         obj.Angle = 360
         obj.Axis = Vector(0,0,1)
+        obj.Instancing = True
 
     def onChanged(self,obj,prop):
         if prop == "ArrayType":
@@ -4448,41 +4517,58 @@ class _Array(_DraftObject):
         import DraftGeomUtils
         if obj.Base:
             pl = obj.Placement
+            instancing = False
+            if hasattr(obj,"Instancing"):
+                instancing = obj.Instancing
             if obj.ArrayType == "ortho":
                 sh = self.rectArray(obj.Base.Shape,obj.IntervalX,obj.IntervalY,
-                                    obj.IntervalZ,obj.NumberX,obj.NumberY,obj.NumberZ)
+                                    obj.IntervalZ,obj.NumberX,obj.NumberY,obj.NumberZ,instancing)
             else:
-                sh = self.polarArray(obj.Base.Shape,obj.Center,obj.Angle.Value,obj.NumberPolar,obj.Axis)
+                sh = self.polarArray(obj.Base.Shape,obj.Center,obj.Angle.Value,obj.NumberPolar,obj.Axis,instancing)
             obj.Shape = sh
             if not DraftGeomUtils.isNull(pl):
                 obj.Placement = pl
 
-    def rectArray(self,shape,xvector,yvector,zvector,xnum,ynum,znum):
+    def copyShape(self,shape,instancing=False):
+        "returns a copy of shape, or an instance sharing its geometry if instancing is True"
+        import DraftGeomUtils
+        if instancing:
+            return DraftGeomUtils.getInstance(shape)
+        return shape.copy()
+
+    def rectArray(self,shape,xvector,yvector,zvector,xnum,ynum,znum,instancing=False):
         import Part
-        base = [shape.copy()]
+        # elements from the previous execution are reused, and only moved if the
+        # intervals changed, so only the added elements need to be copied
+        cache = self.getCache([shape],("ortho",instancing))
+        elements = {}
+        base = []
         for xcount in range(xnum):
-            currentxvector=Vector(xvector).multiply(xcount)
-            if not xcount==0:
-                nshape = shape.copy()
-                nshape.translate(currentxvector)
-                base.append(nshape)
+            currentxvector = Vector(xvector).multiply(xcount)
             for ycount in range(ynum):
-                currentyvector=FreeCAD.Vector(currentxvector)
-                currentyvector=currentyvector.add(Vector(yvector).multiply(ycount))
-                if not ycount==0:
-                    nshape = shape.copy()
-                    nshape.translate(currentyvector)
-                    base.append(nshape)
+                currentyvector = currentxvector.add(Vector(yvector).multiply(ycount))
                 for zcount in range(znum):
-                    currentzvector=FreeCAD.Vector(currentyvector)
-                    currentzvector=currentzvector.add(Vector(zvector).multiply(zcount))
-                    if not zcount==0:
-                        nshape = shape.copy()
-                        nshape.translate(currentzvector)
-                        base.append(nshape)
+                    currentzvector = currentyvector.add(Vector(zvector).multiply(zcount))
+                    base.append(self.getElement(shape,cache,elements,(xcount,ycount,zcount),currentzvector,instancing))
+        if not base:
+            base.append(self.getElement(shape,cache,elements,(0,0,0),Vector(0,0,0),instancing))
+        self.cache = elements
         return Part.makeCompound(base)
 
-    def polarArray(self,shape,center,angle,num,axis):
+    def getElement(self,shape,cache,elements,key,move,instancing=False):
+        "returns the element at index key of a rectangular array, moved by vector move"
+        if key in cache:
+            nshape,pos = cache[key]
+            if pos != move:
+                nshape.translate(move.sub(pos))
+        else:
+            nshape = self.copyShape(shape,instancing)
+            if move.Length:
+                nshape.translate(move)
+        elements[key] = (nshape,move)
+        return nshape
+
+    def polarArray(self,shape,center,angle,num,axis,instancing=False):
         #print "angle ",angle," num ",num
         import Part
         if angle == 360:
@@ -4491,12 +4577,23 @@ class _Array(_DraftObject):
             if num == 0:
                 return shape
             fraction = angle/(num-1)
-        base = [shape.copy()]
-        for i in range(num-1):
-            currangle = fraction + (i*fraction)
-            nshape = shape.copy()
-            nshape.rotate(DraftVecUtils.tup(center), DraftVecUtils.tup(axis), currangle)
+        # elements from the previous execution are rotated to their new angle
+        cache = self.getCache([shape],("polar",DraftVecUtils.tup(center),DraftVecUtils.tup(axis),instancing))
+        elements = {}
+        base = []
+        for i in range(num):
+            currangle = i*fraction
+            if i in cache:
+                nshape,oldangle = cache[i]
+                if oldangle != currangle:
+                    nshape.rotate(DraftVecUtils.tup(center), DraftVecUtils.tup(axis), currangle-oldangle)
+            else:
+                nshape = self.copyShape(shape,instancing)
+                if currangle:
+                    nshape.rotate(DraftVecUtils.tup(center), DraftVecUtils.tup(axis), currangle)
+            elements[i] = (nshape,currangle)
             base.append(nshape)
+        self.cache = elements
         return Part.makeCompound(base)
 
 class _PathArray(_DraftObject):
@@ -4510,10 +4607,12 @@ class _PathArray(_DraftObject):
         obj.addProperty("App::PropertyInteger","Count","Draft","Number of copies")
         obj.addProperty("App::PropertyVector","Xlate","Draft","Optional translation vector")
         obj.addProperty("App::PropertyBool","Align","Draft","Orientation of Base along path")
+        obj.addProperty("App::PropertyBool","Instancing","Draft","If True, copies share the geometry of the base object instead of duplicating it")
         obj.Count = 2
         obj.PathSubs = []
         obj.Xlate = FreeCAD.Vector(0,0,0)
         obj.Align = False
+        obj.Instancing = True
 
     def execute(self,obj):
         import FreeCAD
@@ -4530,7 +4629,10 @@ class _PathArray(_DraftObject):
             else:
                 FreeCAD.Console.PrintLog ("_PathArray.createGeometry: path " + obj.PathObj.Name + " has no edges\n")
                 return
-            obj.Shape = self.pathArray(obj.Base.Shape,w,obj.Count,obj.Xlate,obj.Align) 
+            instancing = False
+            if hasattr(obj,"Instancing"):
+                instancing = obj.Instancing
+            obj.Shape = self.pathArray(obj.Base.Shape,w,obj.Count,obj.Xlate,obj.Align,instancing)
             if not DraftGeomUtils.isNull(pl):
                 obj.Placement = pl
                 
@@ -4542,13 +4644,21 @@ class _PathArray(_DraftObject):
             e = sub[0].Shape.getElement(sub[1])
             sl.append(e)
         return Part.Wire(sl)
+
                                    
-    def getParameterFromV0(self, edge, offset):
-        '''return parameter at distance offset from edge.Vertexes[0]'''
-        '''sb method in Part.TopoShapeEdge???'''
+    def isFlipped(self, edge):
+        '''returns True if the parameters of edge run from its last vertex to its first'''
         lpt = edge.valueAt(edge.getParameterByLength(0))
         vpt = edge.Vertexes[0].Point
-        if not DraftVecUtils.equals(vpt,lpt):
+        return not DraftVecUtils.equals(vpt,lpt)
+
+    def getParameterFromV0(self, edge, offset, flipped=None):
+        '''return parameter at distance offset from edge.Vertexes[0]. flipped can be
+        given if already known from isFlipped(edge)'''
+        '''sb method in Part.TopoShapeEdge???'''
+        if flipped is None:
+            flipped = self.isFlipped(edge)
+        if flipped:
             # this edge is flipped
             length = edge.Length - offset
         else:
@@ -4556,8 +4666,9 @@ class _PathArray(_DraftObject):
             length = offset
         return(edge.getParameterByLength(length))
         
-    def orientShape(self,shape,edge,offset,RefPt,xlate,align):
-        '''Orient shape to tangent at parm offset along edge.'''
+    def orientShape(self,shape,edge,offset,RefPt,xlate,align,instancing=False,parm=None):
+        '''Orient shape to tangent at parm offset along edge. parm is the parameter
+        of the edge at offset, computed here if not given.'''
         import Part
         import DraftGeomUtils
         import math
@@ -4566,7 +4677,10 @@ class _PathArray(_DraftObject):
         x = FreeCAD.Vector(1,0,0)                                    # unit +X
         nullv = FreeCAD.Vector(0,0,0)
         nullPlace =FreeCAD.Placement()
-        ns = shape.copy()
+        if instancing:
+            ns = DraftGeomUtils.getInstance(shape)
+        else:
+            ns = shape.copy()
         ns.Placement.Base = nullPlace.Base                           # reset Placement point so translate goes to right place.
         ns.Placement.Rotation = shape.Placement.Rotation             # preserve global orientation
         ns.translate(RefPt+xlate)
@@ -4574,10 +4688,12 @@ class _PathArray(_DraftObject):
             return ns
             
         # get local coord system - tangent, normal, binormal, if possible
-        t = edge.tangentAt(self.getParameterFromV0(edge,offset))
+        if parm is None:
+            parm = self.getParameterFromV0(edge,offset)
+        t = edge.tangentAt(parm)
         t.normalize()
         try:
-            n = edge.normalAt(self.getParameterFromV0(edge,offset))
+            n = edge.normalAt(parm)
             n.normalize()
             b = (t.cross(n)) 
             b.normalize()
@@ -4602,29 +4718,54 @@ class _PathArray(_DraftObject):
             psi = math.degrees(DraftVecUtils.angle(lnodes,t,z))
             theta = abs(math.degrees(DraftVecUtils.angle(z,b,x)))    # 0<=theta<=pi
             phi = math.degrees(DraftVecUtils.angle(x,lnodes,z))
-        ns.rotate(RefPt,z,psi)
-        ns.rotate(RefPt,x,theta)
-        ns.rotate(RefPt,z,phi)
+        # same as rotating by psi around z, then theta around x, then phi around z,
+        # but the shape is only moved once
+        rot = FreeCAD.Rotation(z,phi).multiply(FreeCAD.Rotation(x,theta)).multiply(FreeCAD.Rotation(z,psi))
+        ns.Placement = FreeCAD.Placement(nullv,rot,RefPt).multiply(ns.Placement)
         return ns
                 
-    def pathArray(self,shape,pathwire,count,xlate,align):
+    def getElement(self,shape,cache,index,edge,offset,RefPt,xlate,align,instancing=False,flipped=None):
+        '''returns the shape oriented at offset along the edge of the path at index,
+        taken from cache if it was already placed there. If RefPt is None, it is
+        computed from the offset.'''
+        key = (index,offset)
+        if key in cache:
+            ns = cache[key]
+        else:
+            parm = None
+            if (RefPt is None) or align:
+                parm = self.getParameterFromV0(edge,offset,flipped)
+            if RefPt is None:
+                RefPt = edge.valueAt(parm)
+            ns = self.orientShape(shape,edge,offset,RefPt,xlate,align,instancing,parm)
+        self.cache[key] = ns
+        return ns
+
+    def pathArray(self,shape,pathwire,count,xlate,align,instancing=False):
         '''Distribute shapes along a path.'''
         import Part
         import DraftGeomUtils
+        import bisect
         closedpath = DraftGeomUtils.isReallyClosed(pathwire)
         path = DraftGeomUtils.sortEdges(pathwire.Edges) 
         ends = []
+        flipped = []
         cdist = 0
         for e in path:                                                 # find cumulative edge end distance
             cdist += e.Length
             ends.append(cdist)
+            flipped.append(self.isFlipped(e))                          # and edge direction, once per edge
+        # shapes placed at the same spot by the previous execution are reused,
+        # if the base shape and the edges of the path are the same shapes
+        cache = self.getCache([shape]+pathwire.Edges,("path",DraftVecUtils.tup(xlate),align,instancing))
+        self.cache = {}
         base = []
         pt = path[0].Vertexes[0].Point                                 # place the start shape
-        ns = self.orientShape(shape,path[0],0,pt,xlate,align)
+        ns = self.getElement(shape,cache,0,path[0],0,pt,xlate,align,instancing,flipped[0])
         base.append(ns)
         if not(closedpath):                                            # closed path doesn't need shape on last vertex
             pt = path[-1].Vertexes[-1].Point                           # place the end shape
-            ns = self.orientShape(shape,path[-1],path[-1].Length,pt,xlate,align)
+            ns = self.getElement(shape,cache,len(path)-1,path[-1],path[-1].Length,pt,xlate,align,instancing,flipped[-1])
             base.append(ns)
         if count < 3:
             return(Part.makeCompound(base))                            
@@ -4638,17 +4779,12 @@ class _PathArray(_DraftObject):
         remain = 0
         travel = step
         for i in range(1,stop):                            
-            # which edge in path should contain this shape?
-            iend = len(ends) - 1                                       # avoids problems with float math travel > ends[-1]
-            for j in range(0,len(ends)):  
-                if travel <= ends[j]:                      
-                    iend = j
-                    break
+            # which edge in path should contain this shape? (first end >= travel)
+            iend = min(bisect.bisect_left(ends,travel),len(ends)-1)    # avoids problems with float math travel > ends[-1]
             # place shape at proper spot on proper edge
             remains = ends[iend] - travel
             offset = path[iend].Length - remains           
-            pt = path[iend].valueAt(self.getParameterFromV0(path[iend],offset))
-            ns = self.orientShape(shape,path[iend],offset,pt,xlate,align)
+            ns = self.getElement(shape,cache,iend,path[iend],offset,None,xlate,align,instancing,flipped[iend])
             base.append(ns)
             travel += step
         return(Part.makeCompound(base))      
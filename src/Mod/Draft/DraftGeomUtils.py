@@ -83,6 +83,12 @@ def isNull(something):
             else:
                     return False
 
+def getInstance(shape):
+    '''getInstance(shape): returns a new shape that shares the underlying geometry of
+    the given shape but has its own placement, so it can be moved or rotated without
+    duplicating the geometry like shape.copy() does'''
+    return Part.makeCompound([shape]).childShapes()[0]
+
 def isPtOnEdge(pt,edge) :
     '''isPtOnEdge(Vector,edge): Tests if a point is on an edge'''
     v = Part.Vertex(pt)
@@ -557,95 +563,85 @@ def isLine(bsp):
             return False
     return True
 
-def sortEdges(lEdges, aVertex=None):
-    "an alternative, more accurate version of Part.__sortEdges__"
-
-    #There is no reason to limit this to lines only because every non-closed edge always
-    #has exactly two vertices (wmayer)
-    #for e in lEdges:
-    #        if not isinstance(e.Curve,Part.Line):
-    #                print "Warning: sortedges cannot treat wired containing curves yet."
-    #                return lEdges
-
-    def lookfor(aVertex, inEdges):
-        ''' Look for (aVertex, inEdges) returns count, the position of the instance
-        the position in the instance and the instance of the Edge'''
-        count = 0
-        linstances = [] #lists the instances of aVertex
-        for i in range(len(inEdges)) :
-            for j in range(2) :
-                if aVertex.Point == inEdges[i].Vertexes[j-1].Point:
-                        instance = inEdges[i]
-                        count += 1
-                        linstances += [i,j-1,instance]
-        return [count]+linstances
-
-    if (len(lEdges) < 2):
-        if aVertex == None:
-            return lEdges
-        else:
-            result = lookfor(aVertex,lEdges)
-            if result[0] != 0:
-                if aVertex.Point == result[3].Vertexes[0].Point:
-                    return lEdges
-                else:
-                    if geomType(result[3]) == "Line":
-                        return [Part.Line(aVertex.Point,result[3].Vertexes[0].Point).toShape()]
-                    elif geomType(result[3]) == "Circle":
-                        mp = findMidpoint(result[3])
-                        return [Part.Arc(aVertex.Point,mp,result[3].Vertexes[0].Point).toShape()]
-                    elif geomType(result[3]) == "BSplineCurve" or\
-                        geomType(result[3]) == "BezierCurve":
-                        if isLine(result[3].Curve):
-                            return [Part.Line(aVertex.Point,result[3].Vertexes[0].Point).toShape()]
-                        else:
-                            return lEdges
-                    else:
-                        return lEdges
+def getEndpointIndex(edges,factor):
+    """getEndpointIndex(edges,factor): returns a dictionary of the end points of the given
+    edges, quantized by factor (see endpointKey), giving for each of them a list of
+    (edge index, vertex index) tuples, the vertex index being 0 or -1"""
+    index = {}
+    for i,e in enumerate(edges):
+        if e.Vertexes:
+            index.setdefault(endpointKey(e.Vertexes[-1].Point,factor),[]).append((i,-1))
+            index.setdefault(endpointKey(e.Vertexes[0].Point,factor),[]).append((i,0))
+    return index
+
+def endpointKey(point,factor):
+    "endpointKey(point,factor): returns a hashable key of a point, rounded to 1/factor"
+    return (int(round(point.x*factor)),int(round(point.y*factor)),int(round(point.z*factor)))
+
+def findEndpoint(index,point,factor,edges):
+    """findEndpoint(index,point,factor,edges): returns the (edge index, vertex index) tuples
+    of an endpoint index of the given edges whose vertex is equal to point (within
+    precision). The neighbouring keys are always searched too, since two equal points can
+    be rounded on both sides of a boundary"""
+    key = endpointKey(point,factor)
+    found = []
+    for dx in (-1,0,1):
+        for dy in (-1,0,1):
+            for dz in (-1,0,1):
+                for i,j in index.get((key[0]+dx,key[1]+dy,key[2]+dz),[]):
+                    if DraftVecUtils.equals(edges[i].Vertexes[j].Point,point):
+                        found.append((i,j))
+    return found
+
+def invertEdge(edge,aVertex):
+    "invertEdge(edge,aVertex): returns a copy of edge starting at aVertex and ending at its first vertex"
+    if geomType(edge) == "Line":
+        return Part.Line(aVertex.Point,edge.Vertexes[0].Point).toShape()
+    elif geomType(edge) == "Circle":
+        mp = findMidpoint(edge)
+        return Part.Arc(aVertex.Point,mp,edge.Vertexes[0].Point).toShape()
+    elif geomType(edge) == "BSplineCurve" or \
+        geomType(edge) == "BezierCurve":
+        if isLine(edge.Curve):
+            return Part.Line(aVertex.Point,edge.Vertexes[0].Point).toShape()
+    return edge
 
-    olEdges = [] # ol stands for ordered list 
+def sortEdges(lEdges, aVertex=None):
+    """an alternative, more accurate version of Part.__sortEdges__. Returns the edges
+    connected to aVertex, or to a free end if aVertex is not given, in order, edges
+    being inverted when needed"""
+    if (len(lEdges) < 2) and (aVertex == None):
+        return lEdges
+    factor = 10**(precision() or 6)
+    index = getEndpointIndex(lEdges,factor)
     if aVertex == None:
-        for i in range(len(lEdges)*2) :
-            if len(lEdges[i/2].Vertexes) > 1:
-                result = lookfor(lEdges[i/2].Vertexes[i%2],lEdges)
-                if result[0] == 1 :  # Have we found an end ?
-                    olEdges = sortEdges(lEdges, result[3].Vertexes[result[2]])
-                    return olEdges
-        # if the wire is closed there is no end so choose 1st Vertex
-        # print "closed wire, starting from ",lEdges[0].Vertexes[0].Point
-        return sortEdges(lEdges, lEdges[0].Vertexes[0]) 
-    else :
-        #print "looking ",aVertex.Point
-        result = lookfor(aVertex,lEdges)
-        if result[0] != 0 :
-            del lEdges[result[1]]
-            next = sortEdges(lEdges, result[3].Vertexes[-((-result[2])^1)])
-            #print "result ",result[3].Vertexes[0].Point,"    ",result[3].Vertexes[1].Point, " compared to ",aVertex.Point
-            if aVertex.Point == result[3].Vertexes[0].Point:
-                #print "keeping"
-                olEdges += [result[3]] + next
-            else:
-                #print "inverting", result[3].Curve
-                if geomType(result[3]) == "Line":
-                    newedge = Part.Line(aVertex.Point,result[3].Vertexes[0].Point).toShape()
-                    olEdges += [newedge] + next
-                elif geomType(result[3]) == "Circle":
-                    mp = findMidpoint(result[3])
-                    newedge = Part.Arc(aVertex.Point,mp,result[3].Vertexes[0].Point).toShape()
-                    olEdges += [newedge] + next
-                elif geomType(result[3]) == "BSplineCurve" or \
-                    geomType(result[3]) == "BezierCurve":
-                    if isLine(result[3].Curve):
-                        newedge = Part.Line(aVertex.Point,result[3].Vertexes[0].Point).toShape()
-                        olEdges += [newedge] + next
-                    else:
-                        olEdges += [result[3]] + next
-                else:
-                    olEdges += [result[3]] + next                                        
-            return olEdges
-        else :
-            return []
-
+        # start from a free end, or from the first vertex if the wire is closed
+        aVertex = lEdges[0].Vertexes[0]
+        for e in lEdges:
+            if len(e.Vertexes) > 1:
+                if len(findEndpoint(index,e.Vertexes[0].Point,factor,lEdges)) == 1:
+                    aVertex = e.Vertexes[0]
+                    break
+                if len(findEndpoint(index,e.Vertexes[1].Point,factor,lEdges)) == 1:
+                    aVertex = e.Vertexes[1]
+                    break
+    olEdges = [] # ol stands for ordered list
+    used = set()
+    while True:
+        found = [r for r in findEndpoint(index,aVertex.Point,factor,lEdges) if not r[0] in used]
+        if not found:
+            break
+        # lowest edge index first, starting from its first vertex if both ends match
+        i,j = min(found,key=lambda r: (r[0],-r[1]))
+        used.add(i)
+        e = lEdges[i]
+        if j == 0:
+            olEdges.append(e)
+            aVertex = e.Vertexes[-1]
+        else:
+            olEdges.append(invertEdge(e,aVertex))
+            aVertex = e.Vertexes[0]
+    return olEdges
 
 def flattenWire(wire):
     '''flattenWire(wire): forces a wire to get completely flat
@@ -668,51 +664,34 @@ def flattenWire(wire):
 def findWires(edgeslist):
     '''finds connected wires in the given list of edges'''
 
-    def touches(e1,e2):
-        if len(e1.Vertexes) < 2:
-            return False
-        if len(e2.Vertexes) < 2:
-            return False
-        if DraftVecUtils.equals(e1.Vertexes[0].Point,e2.Vertexes[0].Point):
-            return True
-        if DraftVecUtils.equals(e1.Vertexes[0].Point,e2.Vertexes[-1].Point):
-            return True
-        if DraftVecUtils.equals(e1.Vertexes[-1].Point,e2.Vertexes[0].Point):
-            return True
-        if DraftVecUtils.equals(e1.Vertexes[-1].Point,e2.Vertexes[-1].Point):
-            return True
-        return False
-    
-    edges = edgeslist[:]
+    # group the edges sharing an end point, with a union-find on edge indices
+    factor = 10**(precision() or 6)
+    parent = range(len(edgeslist))
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    index = {}
+    for i,e in enumerate(edgeslist):
+        if len(e.Vertexes) < 2:
+            continue
+        for k in [0,-1]:
+            v = e.Vertexes[k]
+            for j,l in findEndpoint(index,v.Point,factor,edgeslist):
+                ri = root(i)
+                rj = root(j)
+                if ri != rj:
+                    parent[max(ri,rj)] = min(ri,rj)
+            index.setdefault(endpointKey(v.Point,factor),[]).append((i,k))
+    groups = {}
     wires = []
-    lost = []
-    while edges:
-        e = edges[0]
-        if not wires:
-            # create first group
-            edges.remove(e)
-            wires.append([e])
-        else:
-            found = False
-            for w in wires:
-                if not found:
-                    for we in w:
-                        if touches(e,we):
-                            edges.remove(e)
-                            w.append(e)
-                            found = True
-                            break
-            if not found:
-                if e in lost:
-                    # we already tried this edge, and still nothing
-                    edges.remove(e)
-                    wires.append([e])
-                    lost = []
-                else:
-                    # put to the end of the list
-                    edges.remove(e)
-                    edges.append(e)
-                    lost.append(e)
+    for i,e in enumerate(edgeslist):
+        r = root(i)
+        if not r in groups:
+            groups[r] = []
+            wires.append(groups[r])
+        groups[r].append(e)
     nwires = []
     for w in wires:
         try:
@@ -26,7 +26,7 @@ __author__ = "Yorik van Havre"
 __url__ = "http://www.freecadweb.org"
 
 
-import FreeCAD, FreeCADGui, math, Draft, DraftGui, DraftTrackers, DraftVecUtils
+import FreeCAD, FreeCADGui, math, time, Draft, DraftGui, DraftTrackers, DraftVecUtils
 from FreeCAD import Vector
 from pivy import coin
 from PySide import QtCore,QtGui
@@ -80,6 +80,11 @@ class Snapper:
         self.active = True
         self.forceGridOff = False
         self.lastExtensions = []
+        self.snapCache = {} # snap data of the last snapped objects, see getSnapData()
+        self.snapStats = [0,0.0,0.0] # number of snap events, total and max time spent
+        self.index = SnapIndex()
+        if hasattr(FreeCAD,"addDocumentObserver"):
+            FreeCAD.addDocumentObserver(self.index)
         # the trackers are stored in lists because there can be several views, each with its own set
         self.trackers = [[],[],[],[],[],[],[],[],[]] # view, grid, snap, extline, radius, dim1, dim2, trackLine, extline2
         self.polarAngles = [90,45]
@@ -130,6 +135,26 @@ class Snapper:
         be True to constrain the point against the closest working plane axis.
         Screenpos can be a list, a tuple or a coin.SbVec2s object. If noTracker is True,
         the tracking line is not displayed."""
+        t0 = time.time()
+        point = self.findSnap(screenpos,lastpoint,active,constrain,noTracker)
+        t = time.time()-t0
+        self.snapStats[0] += 1
+        self.snapStats[1] += t
+        self.snapStats[2] = max(self.snapStats[2],t)
+        return point
+
+    def getStats(self,reset=False):
+        "returns a string with the number of snap events and the time spent per event"
+        n,total,tmax = self.snapStats
+        r = str(n) + " snap events"
+        if n:
+            r += ", " + str(round(total*1000/n,2)) + " ms average, " + str(round(tmax*1000,2)) + " ms max"
+        if reset:
+            self.snapStats = [0,0.0,0.0]
+        return r
+
+    def findSnap(self,screenpos,lastpoint=None,active=True,constrain=False,noTracker=False):
+        "does the actual work of snap()"
 
         global Part, DraftGeomUtils
         import Part, DraftGeomUtils
@@ -275,7 +300,7 @@ class Snapper:
                         snaps.extend(self.snapToEndpoints(edge))
                         snaps.extend(self.snapToMidpoint(edge))
                         snaps.extend(self.snapToPerpendicular(edge,lastpoint))
-                        snaps.extend(self.snapToIntersection(edge))
+                        snaps.extend(self.snapToIntersection(edge,point))
                         snaps.extend(self.snapToElines(edge,eline))
                         
                 elif (Draft.getType(obj) == "Structure") and (not oldActive) and archSnap:
@@ -285,7 +310,7 @@ class Snapper:
                             snaps.extend(self.snapToEndpoints(edge))
                             snaps.extend(self.snapToMidpoint(edge))
                             snaps.extend(self.snapToPerpendicular(edge,lastpoint))
-                            snaps.extend(self.snapToIntersection(edge))
+                            snaps.extend(self.snapToIntersection(edge,point))
                             snaps.extend(self.snapToElines(edge,eline))
                     else:
                         b = obj.Placement.Base
@@ -299,13 +324,16 @@ class Snapper:
                         if "Edge" in comp:
                             # we are snapping to an edge
                             en = int(comp[4:])-1
-                            if len(obj.Shape.Edges) > en:
-                                edge = obj.Shape.Edges[en]
+                            data = self.getSnapData(obj)
+                            if len(data['edges']) > en:
+                                edge = data['edges'][en]
+                                if not en in data['midpoints']:
+                                    data['midpoints'][en] = DraftGeomUtils.findMidpoint(edge)
                                 snaps.extend(self.snapToEndpoints(edge))
-                                snaps.extend(self.snapToMidpoint(edge))
+                                snaps.extend(self.snapToMidpoint(edge,data['midpoints'][en]))
                                 snaps.extend(self.snapToPerpendicular(edge,lastpoint))
                                 #snaps.extend(self.snapToOrtho(edge,lastpoint,constrain)) # now part of snapToPolar
-                                snaps.extend(self.snapToIntersection(edge))
+                                snaps.extend(self.snapToIntersection(edge,point))
                                 snaps.extend(self.snapToElines(edge,eline))
                                 
                                 et = DraftGeomUtils.geomType(edge)
@@ -622,12 +650,13 @@ class Snapper:
                         snaps.append([v,'endpoint',self.toWP(v)])
         return snaps
 
-    def snapToMidpoint(self,shape):
-        "returns a list of midpoints snap locations"
+    def snapToMidpoint(self,shape,mp=None):
+        "returns a list of midpoints snap locations. The midpoint can be given if already known"
         snaps = []
         if self.isEnabled("midpoint"):
             if isinstance(shape,Part.Edge):
-                mp = DraftGeomUtils.findMidpoint(shape)
+                if not mp:
+                    mp = DraftGeomUtils.findMidpoint(shape)
                 if mp:
                     snaps.append([mp,'midpoint',self.toWP(mp)])
         return snaps
@@ -744,24 +773,36 @@ class Snapper:
                 snaps.append([c,'center',c])
         return snaps
 
-    def snapToIntersection(self,shape):
-        "returns a list of intersection snap locations"
+    def snapToIntersection(self,shape,point):
+        """returns a list of intersection snap locations, with the edges of all the
+        objects found near point in the snap index"""
         snaps = []
         if self.isEnabled("intersection"):
-            # get the stored objects to calculate intersections
-            if self.lastObj[0]:
-                obj = FreeCAD.ActiveDocument.getObject(self.lastObj[0])
-                if obj:
-                    if obj.isDerivedFrom("Part::Feature"):
-                        if (not self.maxEdges) or (len(obj.Shape.Edges) <= self.maxEdges):
-                            for e in obj.Shape.Edges:
-                                # get the intersection points
-                                pt = DraftGeomUtils.findIntersection(e,shape)
-                                if pt:
-                                    for p in pt:
-                                        snaps.append([p,'intersection',self.toWP(p)])
+            if FreeCAD.ActiveDocument and hasattr(FreeCAD,"DraftWorkingPlane"):
+                h = shape.hashCode()
+                for e in self.index.getEdges(FreeCAD.ActiveDocument,point,self.radius,self.maxEdges):
+                    if e.hashCode() != h:
+                        pt = DraftGeomUtils.findIntersection(e,shape)
+                        if pt:
+                            for p in pt:
+                                snaps.append([p,'intersection',self.toWP(p)])
         return snaps
         
+    def getSnapData(self,obj):
+        """returns the snap data of an object: its edges and their midpoints (filled when
+        needed). The data is cached and rebuilt when the shape of the object changes. The cached shape is
+        kept, so its geometry can't be freed and reused by the new shape"""
+        key = obj.Document.Name + "." + obj.Name
+        shape = obj.Shape
+        if key in self.snapCache:
+            if self.snapCache[key]['shape'].isSame(shape):
+                return self.snapCache[key]
+        if len(self.snapCache) > 100:
+            self.snapCache = {}
+        data = {'shape':shape,'edges':shape.Edges,'midpoints':{}}
+        self.snapCache[key] = data
+        return data
+
     def snapToPolygon(self,obj):
         "returns a list of polygon center snap locations"
         snaps = []
@@ -1217,6 +1258,151 @@ class Snapper:
         if self.grid and (not self.forceGridOff):
             self.grid.set()
         
+class SnapIndex:
+    """A grid index of the edges of the Part objects of a document, in working plane
+    coordinates, used to find the geometry near the cursor. The index of a document is
+    built the first time it is queried, then kept up to date from document events: only
+    the objects that changed since the last query are indexed again"""
+
+    def __init__(self):
+        self.docs = {} # document name: index data, see build()
+        self.wp = None # the working plane the index was built for
+
+    # document observer slots
+
+    def slotCreatedObject(self,obj):
+        self.setDirty(obj)
+
+    def slotDeletedObject(self,obj):
+        self.setDirty(obj)
+
+    def slotChangedObject(self,obj,prop):
+        if prop == "Shape":
+            self.setDirty(obj)
+
+    def slotDeletedDocument(self,doc):
+        if doc.Name in self.docs:
+            del self.docs[doc.Name]
+
+    def setDirty(self,obj):
+        "marks an object to be indexed again"
+        if obj.Document.Name in self.docs:
+            self.docs[obj.Document.Name]['dirty'].add(obj.Name)
+
+    def getBox(self,edge):
+        "returns the 2D bounding box (xmin,ymin,xmax,ymax) of an edge in working plane coordinates"
+        wp = FreeCAD.DraftWorkingPlane
+        if len(edge.Vertexes) == 2 and (DraftGeomUtils.geomType(edge) == "Line"):
+            pts = [wp.getLocalCoords(v.Point) for v in edge.Vertexes]
+        else:
+            b = edge.BoundBox
+            pts = [wp.getLocalCoords(Vector(x,y,z)) for x in (b.XMin,b.XMax) for y in (b.YMin,b.YMax) for z in (b.ZMin,b.ZMax)]
+        return (min([p.x for p in pts]),min([p.y for p in pts]),max([p.x for p in pts]),max([p.y for p in pts]))
+
+    def getCells(self,box,size):
+        "returns the cells covered by a 2D box"
+        return [(x,y) for x in range(int(math.floor(box[0]/size)),int(math.floor(box[2]/size))+1)
+                      for y in range(int(math.floor(box[1]/size)),int(math.floor(box[3]/size))+1)]
+
+    def build(self,doc):
+        "indexes all the objects of a document"
+        data = {'grid':{},'objects':{},'dirty':set(),'size':1}
+        self.docs[doc.Name] = data
+        objs = [o for o in doc.Objects if o.isDerivedFrom("Part::Feature")]
+        nedges = 0
+        for o in objs:
+            if not o.Shape.isNull():
+                nedges += len(o.Shape.Edges)
+        if nedges:
+            boxes = [o.Shape.BoundBox for o in objs if not o.Shape.isNull()]
+            if boxes:
+                area = 0
+                for b in boxes:
+                    area += max(b.XLength,b.YLength,b.ZLength)**2
+                data['size'] = max(math.sqrt(area/nedges),10**(-Draft.precision()))
+        for o in objs:
+            self.addObject(data,o)
+        return data
+
+    def addObject(self,data,obj):
+        "adds the edges of an object to the index"
+        if not obj.isDerivedFrom("Part::Feature"):
+            return
+        if obj.Shape.isNull():
+            return
+        edges = obj.Shape.Edges
+        boxes = []
+        cells = set()
+        for i,e in enumerate(edges):
+            box = self.getBox(e)
+            boxes.append(box)
+            for cell in self.getCells(box,data['size']):
+                data['grid'].setdefault(cell,[]).append((obj.Name,i))
+                cells.add(cell)
+        data['objects'][obj.Name] = (edges,boxes,cells)
+
+    def removeObject(self,data,name):
+        "removes the edges of an object from the index"
+        if name in data['objects']:
+            for cell in data['objects'][name][2]:
+                data['grid'][cell] = [c for c in data['grid'][cell] if c[0] != name]
+            del data['objects'][name]
+
+    def update(self,doc):
+        "returns the index data of a document, after indexing again the objects that changed"
+        wp = FreeCAD.DraftWorkingPlane
+        sig = tuple([(v.x,v.y,v.z) for v in (wp.u,wp.v,wp.axis,wp.position)])
+        if sig != self.wp:
+            # the working plane changed, all coordinates are obsolete
+            self.docs = {}
+            self.wp = sig
+        if not doc.Name in self.docs:
+            return self.build(doc)
+        data = self.docs[doc.Name]
+        while data['dirty']:
+            name = data['dirty'].pop()
+            self.removeObject(data,name)
+            obj = doc.getObject(name)
+            if obj:
+                self.addObject(data,obj)
+        return data
+
+    def getEdges(self,doc,point,radius,maxEdges=0):
+        """returns the edges of the visible objects of a document found at less than radius
+        from the given point in the working plane. If maxEdges is given, objects with more
+        edges are skipped"""
+        data = self.update(doc)
+        p = FreeCAD.DraftWorkingPlane.getLocalCoords(point)
+        box = (p.x-radius,p.y-radius,p.x+radius,p.y+radius)
+        size = data['size']
+        ncells = (int(2*radius/size)+1)**2
+        if ncells < len(data['grid']):
+            found = set()
+            for cell in self.getCells(box,size):
+                found.update(data['grid'].get(cell,[]))
+        else:
+            # bigger than the grid itself, scan all its cells
+            found = set()
+            xmin,ymin = int(math.floor(box[0]/size)),int(math.floor(box[1]/size))
+            xmax,ymax = int(math.floor(box[2]/size)),int(math.floor(box[3]/size))
+            for cell,items in data['grid'].items():
+                if (xmin <= cell[0] <= xmax) and (ymin <= cell[1] <= ymax):
+                    found.update(items)
+        edges = []
+        visible = {}
+        for name,i in sorted(found):
+            if not name in visible:
+                obj = doc.getObject(name)
+                visible[name] = False
+                if obj and obj.ViewObject and obj.ViewObject.Visibility:
+                    if (not maxEdges) or (len(data['objects'][name][0]) <= maxEdges):
+                        visible[name] = True
+            if visible[name]:
+                b = data['objects'][name][1][i]
+                if (b[0] <= box[2]) and (b[2] >= box[0]) and (b[1] <= box[3]) and (b[3] >= box[1]):
+                    edges.append(data['objects'][name][0][i])
+        return edges
+
 if not hasattr(FreeCADGui,"Snapper"):
     FreeCADGui.Snapper = Snapper()
 if not hasattr(FreeCAD,"DraftWorkingPlane"):
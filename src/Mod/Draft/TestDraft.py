@@ -134,6 +134,30 @@ class DraftTest(unittest.TestCase):
 
     # modification tools
 
+    # geometry utilities
+
+    def testSortEdges(self):
+        FreeCAD.Console.PrintLog ('Checking Draft sortEdges...\n')
+        import Part, DraftGeomUtils, DraftVecUtils
+        # the ends of e1 and e2 are equal within precision, but rounded to different keys
+        e1 = Part.Line(FreeCAD.Vector(0,0,0),FreeCAD.Vector(1.0000004,0,0)).toShape()
+        e2 = Part.Line(FreeCAD.Vector(2,0,0),FreeCAD.Vector(1.0000006,0,0)).toShape()
+        e3 = Part.Line(FreeCAD.Vector(2,0,0),FreeCAD.Vector(2,1,0)).toShape()
+        def chained(edges,start,end):
+            if len(edges) != 3:
+                return False
+            if not DraftVecUtils.equals(edges[0].Vertexes[0].Point,start):
+                return False
+            if not DraftVecUtils.equals(edges[-1].Vertexes[-1].Point,end):
+                return False
+            for i in range(2):
+                if not DraftVecUtils.equals(edges[i].Vertexes[-1].Point,edges[i+1].Vertexes[0].Point):
+                    return False
+            return True
+        r = chained(DraftGeomUtils.sortEdges([e3,e2,e1]),FreeCAD.Vector(2,1,0),FreeCAD.Vector(0,0,0))
+        r = r and chained(DraftGeomUtils.sortEdges([e3,e2,e1],e1.Vertexes[0]),FreeCAD.Vector(0,0,0),FreeCAD.Vector(2,1,0))
+        self.failUnless(r,"Draft sortEdges failed")
+
     def tearDown(self):
         FreeCAD.closeDocument("DraftTest")
         pass
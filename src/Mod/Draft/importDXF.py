@@ -42,7 +42,7 @@ texts, colors,layers (from groups)
 TEXTSCALING = 1.35 # scaling factor between autocad font sizes and coin font sizes
 CURRENTDXFLIB = 1.38 # the minimal version of the dxfLibrary needed to run 
 
-import sys, FreeCAD, os, Part, math, re, string, Mesh, Draft, DraftVecUtils, DraftGeomUtils
+import sys, FreeCAD, os, Part, math, re, string, time, Mesh, Draft, DraftVecUtils, DraftGeomUtils
 from Draft import _Dimension, _ViewProviderDimension
 from FreeCAD import Vector
 
@@ -744,10 +744,28 @@ def drawSpline(spline,forceShape=False):
     return None
     
 def drawBlock(blockref,num=None,createObject=False):
-    "returns a shape from a dxf block reference"
+    "returns a shape from a dxf block reference. Shapes are built only once per block"
     if not dxfStarBlocks:
         if blockref.name[0] == '*':
             return None
+    if blockshapes.has_key(blockref.name):
+        shape = blockshapes[blockref.name]
+    else:
+        shape = buildBlock(blockref)
+        blockshapes[blockref.name] = shape
+    if shape:
+        if createObject:
+            if not blockobjects.has_key(blockref.name):
+                newob=doc.addObject("Part::Feature",blockref.name)
+                newob.Shape = shape
+                blockobjects[blockref.name] = newob
+            return blockobjects[blockref.name]
+        return shape
+    return None
+
+def buildBlock(blockref):
+    "builds a compound from the contents of a dxf block reference"
+    blockshapes[blockref.name] = None # an insert of the block inside itself will be skipped
     if len(blockref.entities.data) == 0:
         print "skipping empty block ",blockref.name
         return None
@@ -788,17 +806,10 @@ def drawBlock(blockref,num=None,createObject=False):
              if dxfImportLayouts or (not rawValue(text,67)):
                 print "adding block text",text.value, " from ",blockref
                 addText(text)
+    shape = None
     try: shape = Part.makeCompound(shapes)
     except: warn(blockref)
-    if shape:
-        blockshapes[blockref.name]=shape
-        if createObject:
-            newob=doc.addObject("Part::Feature",blockref.name)
-            newob.Shape = shape
-            blockobjects[blockref.name] = newob
-            return newob
-        return shape
-    return None
+    return shape
 
 def drawInsert(insert,num=None,clone=False):
     if dxfImportTexts:
@@ -821,17 +832,25 @@ def drawInsert(insert,num=None,clone=False):
         else:
             shape = None
     else:
-        if blockshapes.has_key(insert):
-            shape = blockshapes[insert.block].copy()
+        if blockshapes.has_key(insert.block):
+            shape = blockshapes[insert.block]
+        elif blockindex.has_key(insert.block):
+            shape = drawBlock(blockindex[insert.block],num)
         else:
             shape = None
-            for b in drawing.blocks.data:
-                if b.name == insert.block:
-                    shape = drawBlock(b,num)
         if shape:
             pos = vec(insert.loc)
             rot = math.radians(insert.rotation)
             scale = insert.scale
+            b = shape.BoundBox
+            flat = (round(b.ZMin,prec()) == 0) and (round(b.ZMax,prec()) == 0)
+            if flat and (scale[0] == 1) and (scale[1] == 1):
+                # instance the block shape: the new compound shares its geometry. Only
+                # done for blocks lying in the XY plane, which the other path would
+                # flatten anyway, so the Z scale has no effect on them either
+                shape = Part.makeCompound([shape])
+                shape.Placement = FreeCAD.Placement(pos,FreeCAD.Rotation(FreeCAD.Vector(0,0,1),insert.rotation))
+                return shape
             tsf = FreeCAD.Matrix()
             tsf.scale(scale[0],scale[1],0) # for some reason z must be 0 to work
             tsf.rotateZ(rot)
@@ -969,6 +988,62 @@ def addToBlock(obj,layer):
     else:
         layerBlocks[layer] = [obj]
 
+def addToBulk(shape,name,layer,dxfobj):
+    "adds given shape to the bulk objects of its layer, type and color"
+    key = (layer,name,getattr(dxfobj,"color_index",256))
+    if key in bulkShapes:
+        bulkShapes[key][1].append(shape)
+    else:
+        bulkShapes[key] = [dxfobj,[shape]]
+
+def addToSketch(sketch,shapes):
+    """adds the edges of the given shapes to a sketch in one operation, with coincident
+    constraints between the consecutive lines of each shape"""
+    from Sketcher import Constraint
+    geoms = []
+    constraints = []
+    start = sketch.GeometryCount
+    for sh in shapes:
+        prev = None
+        for e in sh.Edges:
+            g = DraftGeomUtils.geom(e,sketch.Placement)
+            if isinstance(g,Part.Line) and isinstance(prev,Part.Line):
+                if DraftVecUtils.equals(prev.EndPoint,g.StartPoint):
+                    constraints.append(Constraint("Coincident",start+len(geoms)-1,2,start+len(geoms),1))
+            geoms.append(g)
+            prev = g
+    if geoms:
+        sketch.addGeometry(geoms)
+    if constraints:
+        sketch.addConstraint(constraints)
+
+def drawBulk():
+    """creates the objects gathered by addToBulk: one compound per layer, type and color,
+    or one sketch per layer for lines, polylines, arcs and circles in sketch mode"""
+    sketches = {}
+    for key in sorted(bulkShapes.keys()):
+        layer,name,color = key
+        dxfobj,shapes = bulkShapes[key]
+        if dxfCreateSketch and (name in ["Line","Polyline","Arc","Circle"]):
+            if not layer in sketches:
+                sketches[layer] = doc.addObject("Sketcher::SketchObject","Sketch")
+                if gui:
+                    sketches[layer].ViewObject.Autoconstraints = False
+                locateLayer(layer).addObject(sketches[layer])
+            addToSketch(sketches[layer],shapes)
+        else:
+            newob = addObject(Part.makeCompound(shapes),name,layer)
+            if gui: formatObject(newob,dxfobj)
+    for sk in sketches.values():
+        sk.solve()
+    if bulkShapes:
+        FreeCAD.Console.PrintMessage("bulk mode: created "+str(len(bulkShapes))+" objects\n")
+
+def reportBulk(name,num,t0):
+    "prints the number of entities of a type drawn in bulk mode and the throughput"
+    t = time.time()-t0
+    FreeCAD.Console.PrintMessage("  "+str(num)+" "+name+" in "+str(round(t,2))+" s ("+str(int(num/max(t,0.001)))+" entities/s)\n")
+
 def processdxf(document,filename,getShapes=False):
     "this does the translation of the dxf contents into FreeCAD Part objects"
     global drawing # for debugging - so drawing is still accessible to python after the script ran
@@ -980,12 +1055,19 @@ def processdxf(document,filename,getShapes=False):
     doc = document
     global blockshapes
     blockshapes = {}
+    global blockindex
+    blockindex = {}
+    for b in drawing.blocks.data:
+        blockindex[b.name] = b
     global blockobjects
     blockobjects = {}
     global badobjects
     badobjects = []
     global layerBlocks
     layerBlocks = {}
+    global bulkShapes
+    bulkShapes = {}
+    bulk = dxfBulkImport and not (getShapes or dxfJoin or dxfMakeBlocks)
     sketch = None
     shapes = []
 
@@ -993,11 +1075,14 @@ def processdxf(document,filename,getShapes=False):
 
     lines = drawing.entities.get_type("line")
     if lines: FreeCAD.Console.PrintMessage("drawing "+str(len(lines))+" lines...\n")
+    t0 = time.time()
     for line in lines:
         if dxfImportLayouts or (not rawValue(line,67)):
-            shape = drawLine(line)
+            shape = drawLine(line,forceShape=bulk)
             if shape:
-                if dxfCreateSketch:
+                if bulk:
+                    addToBulk(shape,"Line",line.layer,line)
+                elif dxfCreateSketch:
                     if dxfMakeBlocks or dxfJoin:
                         if sketch:
                             shape = Draft.makeSketch(shape,autoconstraints=True,addTo=sketch)
@@ -1016,6 +1101,7 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Line",line.layer)
                     if gui: formatObject(newob,line)
+    if bulk and lines: reportBulk("lines",len(lines),t0)
 
     # drawing polylines
 
@@ -1034,11 +1120,17 @@ def processdxf(document,filename,getShapes=False):
     if polylines:
         FreeCAD.Console.PrintMessage("drawing "+str(len(polylines))+" polylines...\n")
     num = 0
+    t0 = time.time()
     for polyline in polylines:
         if dxfImportLayouts or (not rawValue(polyline,67)):
-            shape = drawPolyline(polyline,num)
+            if bulk:
+                shape = drawPolyline(polyline,forceShape=True,num=num)
+            else:
+                shape = drawPolyline(polyline,num)
             if shape:
-                if dxfCreateSketch:
+                if bulk:
+                    addToBulk(shape,"Polyline",polyline.layer,polyline)
+                elif dxfCreateSketch:
                     if isinstance(shape,Part.Shape):
                         t = FreeCAD.ActiveDocument.addObject("Part::Feature","Shape")
                         t.Shape = shape
@@ -1062,16 +1154,20 @@ def processdxf(document,filename,getShapes=False):
                     newob = addObject(shape,"Polyline",polyline.layer)
                     if gui: formatObject(newob,polyline)
             num += 1
+    if bulk and polylines: reportBulk("polylines",len(polylines),t0)
 
     # drawing arcs
 
     arcs = drawing.entities.get_type("arc")
     if arcs: FreeCAD.Console.PrintMessage("drawing "+str(len(arcs))+" arcs...\n")
+    t0 = time.time()
     for arc in arcs:
         if dxfImportLayouts or (not rawValue(arc,67)):
-            shape = drawArc(arc)
+            shape = drawArc(arc,forceShape=bulk)
             if shape:
-                if dxfCreateSketch:
+                if bulk:
+                    addToBulk(shape,"Arc",arc.layer,arc)
+                elif dxfCreateSketch:
                     if dxfMakeBlocks or dxfJoin:
                         if sketch:
                             shape = Draft.makeSketch(shape,autoconstraints=True,addTo=sketch)
@@ -1090,6 +1186,7 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Arc",arc.layer)
                     if gui: formatObject(newob,arc)
+    if bulk and arcs: reportBulk("arcs",len(arcs),t0)
 
     # joining lines, polylines and arcs if needed
 
@@ -1106,11 +1203,14 @@ def processdxf(document,filename,getShapes=False):
 
     circles = drawing.entities.get_type("circle")
     if circles: FreeCAD.Console.PrintMessage("drawing "+str(len(circles))+" circles...\n")
+    t0 = time.time()
     for circle in circles:
         if dxfImportLayouts or (not rawValue(circle,67)):
-            shape = drawCircle(circle)
+            shape = drawCircle(circle,forceShape=bulk)
             if shape:
-                if dxfCreateSketch:
+                if bulk:
+                    addToBulk(shape,"Circle",circle.layer,circle)
+                elif dxfCreateSketch:
                     if dxfMakeBlocks or dxfJoin:
                         if sketch:
                             shape = Draft.makeSketch(shape,autoconstraints=True,addTo=sketch)
@@ -1129,17 +1229,21 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Circle",circle.layer)
                     if gui: formatObject(newob,circle)
+    if bulk and circles: reportBulk("circles",len(circles),t0)
 
     # drawing solids
 
     solids = drawing.entities.get_type("solid")
     if solids: FreeCAD.Console.PrintMessage("drawing "+str(len(circles))+" solids...\n")
+    t0 = time.time()
     for solid in solids:
         lay = rawValue(solid,8)
         if dxfImportLayouts or (not rawValue(solid,67)):
             shape = drawSolid(solid)
             if shape:
-                if dxfMakeBlocks:
+                if bulk:
+                    addToBulk(shape,"Solid",lay,solid)
+                elif dxfMakeBlocks:
                     addToBlock(shape,lay)
                 elif getShapes:
                     if isinstance(shape,Part.Shape):
@@ -1149,17 +1253,21 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Solid",lay)
                     if gui: formatObject(newob,solid)
+    if bulk and solids: reportBulk("solids",len(solids),t0)
 
     # drawing splines
 
     splines = drawing.entities.get_type("spline")
     if splines: FreeCAD.Console.PrintMessage("drawing "+str(len(splines))+" splines...\n")
+    t0 = time.time()
     for spline in splines:
         lay = rawValue(spline,8)
         if dxfImportLayouts or (not rawValue(spline,67)):
-            shape = drawSpline(spline)
+            shape = drawSpline(spline,forceShape=bulk)
             if shape:
-                if dxfMakeBlocks:
+                if bulk:
+                    addToBulk(shape,"Spline",lay,spline)
+                elif dxfMakeBlocks:
                     addToBlock(shape,lay)
                 elif getShapes:
                     if isinstance(shape,Part.Shape):
@@ -1169,17 +1277,21 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Spline",lay)
                     if gui: formatObject(newob,spline)
-                    
+    if bulk and splines: reportBulk("splines",len(splines),t0)
+
     # drawing ellipses
     
     ellipses = drawing.entities.get_type("ellipse")
     if ellipses: FreeCAD.Console.PrintMessage("drawing "+str(len(ellipses))+" ellipses...\n")
+    t0 = time.time()
     for ellipse in ellipses:
         lay = rawValue(ellipse,8)
         if dxfImportLayouts or (not rawValue(ellipse,67)):
             shape = drawEllipse(ellipse)
             if shape:
-                if dxfMakeBlocks:
+                if bulk:
+                    addToBulk(shape,"Ellipse",lay,ellipse)
+                elif dxfMakeBlocks:
                     addToBlock(shape,lay)
                 elif getShapes:
                     if isinstance(shape,Part.Shape):
@@ -1189,6 +1301,14 @@ def processdxf(document,filename,getShapes=False):
                 else:
                     newob = addObject(shape,"Ellipse",lay)
                     if gui: formatObject(newob,ellipse)
+    if bulk and ellipses: reportBulk("ellipses",len(ellipses),t0)
+
+    # creating bulk objects
+
+    if bulk:
+        t0 = time.time()
+        drawBulk()
+        reportBulk("bulk objects",len(bulkShapes),t0)
 
     # drawing texts
 
@@ -1424,6 +1544,8 @@ def processdxf(document,filename,getShapes=False):
     if badobjects: print "dxf: ",len(badobjects)," objects were not imported"
     del doc
     del blockshapes
+    del blockindex
+    del bulkShapes
 
 def warn(dxfobject,num=None):
     "outputs a warning if a dxf object couldn't be imported"
@@ -1730,6 +1852,47 @@ def writeMesh(ob,dxfobject):
                                          64, color=getACI(ob),
                                          layer=getGroup(ob)))
                                 
+class dxfStreamSection:
+    "a list of dxf entities, written to a temporary file as they are appended"
+    def __init__(self):
+        import tempfile
+        self.file = tempfile.TemporaryFile()
+        self.count = 0
+
+    def append(self,entity):
+        self.file.write(str(entity))
+        self.count += 1
+
+    def copyTo(self,f):
+        "writes the contents of this section to the given file, and closes it"
+        import shutil
+        self.file.seek(0)
+        shutil.copyfileobj(self.file,f)
+        self.file.close()
+
+class dxfStream:
+    """a replacement for dxfLibrary.Drawing which doesn't keep the entities and blocks in
+    memory: they are written to temporary files as they are added, and assembled with the
+    header and tables of an empty drawing when saving"""
+    def __init__(self):
+        self.blocks = dxfStreamSection()
+        self.entities = dxfStreamSection()
+
+    def append(self,entity):
+        self.entities.append(entity)
+
+    def saveas(self,filename):
+        head = str(dxfLibrary.Drawing())
+        head = head[:head.index("0\nSECTION\n2\nBLOCKS\n")]
+        f = pythonopen(filename,"w")
+        f.write(head)
+        f.write("0\nSECTION\n2\nBLOCKS\n")
+        self.blocks.copyTo(f)
+        f.write("0\nENDSEC\n0\nSECTION\n2\nENTITIES\n")
+        self.entities.copyTo(f)
+        f.write("0\nENDSEC\n0\nEOF\n")
+        f.close()
+
 def export(objectslist,filename,nospline=False,lwPoly=False):
     "called when freecad exports a file. If nospline=True, bsplines are exported as straight segs lwPoly=True for OpenSCAD DXF"
     
@@ -1752,7 +1915,10 @@ def export(objectslist,filename,nospline=False,lwPoly=False):
     
         else:
             # other cases, treat edges
-            dxf = dxfLibrary.Drawing()
+            if dxfStreamExport and ("0\nSECTION\n2\nBLOCKS\n" in str(dxfLibrary.Drawing())):
+                dxf = dxfStream()
+            else:
+                dxf = dxfLibrary.Drawing()
             for ob in exportList:
                 print "processing ",ob.Name
                 if ob.isDerivedFrom("Part::Feature"):
@@ -1845,5 +2011,7 @@ dxfImportHatches = p.GetBool("importDxfHatches",False)
 dxfUseStandardSize = p.GetBool("dxfStdSize",False)
 dxfGetColors = p.GetBool("dxfGetOriginalColors",False)
 dxfUseDraftVisGroups = p.GetBool("dxfUseDraftVisGroups",False)
+dxfBulkImport = p.GetBool("dxfBulkImport",False)
+dxfStreamExport = p.GetBool("dxfStreamExport",True)
 dxfBrightBackground = isBrightBackground()
 dxfDefaultColor = getColor()
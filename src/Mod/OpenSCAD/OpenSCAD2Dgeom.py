@@ -51,6 +51,51 @@ class Overlappingfaces():
             return all([f1.isInside(vert.Point,tol,inface) for vert in verts])
         return vertsinface(bigface,smallface.Vertexes)
 
+    @staticmethod
+    def dofacesoverlapvertinface(bigface,smallface,tol=0.001):
+        '''check if a vertex of smallface lies strictly inside bigface,
+        which means that the faces overlap. Only done for coplanar planar
+        faces. The vertex is classified in the parameter space of bigface
+        and must be farther than tol from its boundary'''
+        import Part
+        plane = bigface.Surface
+        if not (isinstance(plane,Part.Plane) and \
+                isinstance(smallface.Surface,Part.Plane)):
+            return False
+        if plane.Axis.cross(smallface.Surface.Axis).Length > 1e-9:
+            return False
+        for vert in smallface.Vertexes:
+            u,v = plane.parameter(vert.Point)
+            if plane.value(u,v).distanceToPoint(vert.Point) > tol:
+                return False # not in the same plane
+            if bigface.isPartOfDomain(u,v) and min([vert.distToShape(\
+                    wire)[0] for wire in bigface.Wires]) > tol:
+                return True
+        return False
+
+    @staticmethod
+    def boundboxoverlappairs(faces,tol=1e-7):
+        '''returns the sorted list of the index pairs of the faces with
+        intersecting bounding boxes, swept along the x axis. The boxes of
+        planar faces are flat, so the y and z ranges are compared with
+        <= and tol instead of using BoundBox.isIntersection'''
+        boxes = [face.BoundBox for face in faces]
+        order = sorted(range(len(faces)),key=(lambda i: boxes[i].XMin))
+        pairs = []
+        active = []
+        for i in order:
+            bi = boxes[i]
+            active = [j for j in active if boxes[j].XMax >= bi.XMin]
+            for j in active:
+                bj = boxes[j]
+                if bj.YMin <= bi.YMax + tol and bi.YMin <= bj.YMax + tol \
+                        and bj.ZMin <= bi.ZMax + tol \
+                        and bi.ZMin <= bj.ZMax + tol:
+                    pairs.append((min(i,j),max(i,j)))
+            active.append(i)
+        pairs.sort()
+        return pairs
+
     @staticmethod
     def dofacesoverlapboolean(bigface,smallface):
         #import FreeCAD,FreeCADGui
@@ -59,13 +104,20 @@ class Overlappingfaces():
         return bigface.common(smallface).Area > 0
 
     def builddepdict(self):
-        import itertools
+        import FreeCAD
         #isinsidelist = []
         self.isinsidedict = {}
-        #for bigface, smallface in itertools.combinations(sortedfaces,2):
-        for bigfacei, smallfacei in itertools.combinations(range(len(self.sortedfaces)),2):
+        numfaces = len(self.sortedfaces)
+        # only the pairs with intersecting bounding boxes can overlap
+        pairs = Overlappingfaces.boundboxoverlappairs(self.sortedfaces)
+        FreeCAD.Console.PrintLog('Overlappingfaces: %d of %d face pairs '\
+                'tested\n' % (len(pairs),numfaces*(numfaces-1)/2))
+        for bigfacei, smallfacei in pairs:
             try:
-                overlap = Overlappingfaces.dofacesoverlapboolean(\
+                overlap = Overlappingfaces.dofacesoverlapvertinface(\
+                        self.sortedfaces[bigfacei],\
+                        self.sortedfaces[smallfacei]) or \
+                        Overlappingfaces.dofacesoverlapboolean(\
                         self.sortedfaces[bigfacei],self.sortedfaces[smallfacei])
             except:
                 overlap = Overlappingfaces.dofacesoverlapallverts(\
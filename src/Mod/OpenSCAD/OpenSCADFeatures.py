@@ -337,6 +337,24 @@ class GetWire:
             fp.Shape=Part.Wire(fp.Base.Shape.Wires[0]) # works with 0.13 stable
             #sh = fp.Base.Shape.Wires[0].copy; sh.transformSahpe(fp.Base.Shape.Placement.toMatrix()); fp.Shape = sh #untested
 
+class Instance:
+    '''shares the shape of the base object, with its own placement
+    instead of the placement of the base object'''
+    def __init__(self, obj,child=None):
+        obj.addProperty("App::PropertyLink","Base","Base",
+                        "The object whose shape is shared")
+        obj.Proxy = self
+        obj.Base = child
+
+    def onChanged(self, fp, prop):
+        "Do something when a property has changed"
+        pass
+
+    def execute(self, fp):
+        if fp.Base:
+            # the geometry is not copied, only the placement is replaced
+            fp.Shape = fp.Base.Shape
+
 class Frustum:
     def __init__(self, obj,r1=1,r2=2,n=3,h=4):
         obj.addProperty("App::PropertyInteger","FacesNumber","Base","Number of faces")
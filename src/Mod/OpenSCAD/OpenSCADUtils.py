@@ -115,6 +115,19 @@ def newtempfilename():
 
 tempfilenamegen=newtempfilename()
 
+def gettempdir():
+    '''returns the directory of the files exchanged with OpenSCAD: the
+    tempdir parameter if set, otherwise the system temp directory.
+    Setting it to a RAM backed directory (like /dev/shm) keeps the
+    exchange off the disk, if OpenSCAD can access that directory'''
+    import FreeCAD,os,tempfile
+    dir1 = FreeCAD.ParamGet(\
+        "User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+        GetString('tempdir')
+    if dir1 and os.path.isdir(dir1):
+        return dir1
+    return tempfile.gettempdir()
+
 def callopenscad(inputfilename,outputfilename=None,outputext='csg',keepname=False):
     '''call the open scad binary
     returns the filename of the result (or None),
@@ -138,7 +151,7 @@ def callopenscad(inputfilename,outputfilename=None,outputext='csg',keepname=Fals
         GetString('openscadexecutable')
     if osfilename and os.path.isfile(osfilename):
         if not outputfilename:
-            dir1=tempfile.gettempdir()
+            dir1=gettempdir()
             if keepname:
                 outputfilename=os.path.join(dir1,'%s.%s' % (os.path.split(\
                     inputfilename)[1].rsplit('.',1)[0],outputext))
@@ -154,8 +167,8 @@ def callopenscadstring(scadstr,outputext='csg'):
     '''create a tempfile and call the open scad binary
     returns the filename of the result (or None),
     please delete the file afterwards'''
-    import os,tempfile,time
-    dir1=tempfile.gettempdir()
+    import os,time
+    dir1=gettempdir()
     inputfilename=os.path.join(dir1,'%s.scad' % tempfilenamegen.next())
     inputfile = open(inputfilename,'w')
     inputfile.write(scadstr)
@@ -379,9 +392,23 @@ def roundrotation(rot,maxangulardistance=1e-5):
     else: #use original
         return rot
 
-def callopenscadmeshstring(scadstr):
-    """Call OpenSCAD and return the result as a Mesh"""
-    import Mesh,os
+# The meshes returned by OpenSCAD, by the OpenSCAD executable and the md5
+# of the operation and of its input meshes, so repeating an operation on
+# unchanged meshes returns at once instead of running CGAL again
+meshcache = {}
+meshcachesize = 100
+
+def callopenscadmeshstring(scadstr,key=None):
+    """Call OpenSCAD and return the result as a Mesh
+    The result is cached by key, or by the md5 of scadstr if no key is given"""
+    import FreeCAD,Mesh,os,hashlib
+    if key is None:
+        key = hashlib.md5(scadstr).hexdigest()
+    key = (FreeCAD.ParamGet(\
+        "User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+        GetString('openscadexecutable'),key)
+    if key in meshcache:
+        return Mesh.Mesh(meshcache[key])
     tmpfilename=callopenscadstring(scadstr,'stl')
     newmesh=Mesh.Mesh()
     newmesh.read(tmpfilename)
@@ -389,6 +416,12 @@ def callopenscadmeshstring(scadstr):
         os.unlink(tmpfilename)
     except OSError:
         pass
+    if newmesh.CountFacets == 0:
+        # OpenSCAD failed, or the result is empty: not worth keeping
+        return newmesh
+    if len(meshcache) >= meshcachesize:
+        meshcache.clear()
+    meshcache[key] = Mesh.Mesh(newmesh)
     return newmesh
 
 def meshopinline(opname,iterable1):
@@ -407,18 +440,24 @@ def meshoptempfile(opname,iterable1):
     FreeCAD Mesh objects
     uses stl files to supply the mesh data
     """
-    import os,tempfile
-    dir1=tempfile.gettempdir()
+    import os,hashlib
+    dir1=gettempdir()
     filenames = []
+    # the key of the result is made from the stl data, as the file names change
+    key = hashlib.md5(opname)
     for mesh in iterable1:
         outputfilename=os.path.join(dir1,'%s.stl' % tempfilenamegen.next())
         mesh.write(outputfilename)
         filenames.append(outputfilename)
+        f = open(outputfilename,'rb')
+        key.update(f.read())
+        f.close()
     #absolute path causes error. We rely that the scad file will be in the dame tmpdir
     meshimports = ' '.join("import(file = \"%s\");" % \
         #filename \
         os.path.split(filename)[1] for filename in filenames)
-    result = callopenscadmeshstring('%s(){%s}' % (opname,meshimports))
+    result = callopenscadmeshstring('%s(){%s}' % (opname,meshimports),\
+        key.hexdigest())
     for filename in filenames:
         try:
             os.unlink(filename)
@@ -462,8 +501,8 @@ def meshoponobjs(opname,inobjs):
 
 def process2D_ObjectsViaOpenSCADShape(ObjList,Operation,doc):
     import FreeCAD,importDXF
-    import os,tempfile
-    dir1=tempfile.gettempdir()
+    import os
+    dir1=gettempdir()
     filenames = []
     for item in ObjList :
         outputfilename=os.path.join(dir1,'%s.dxf' % tempfilenamegen.next())
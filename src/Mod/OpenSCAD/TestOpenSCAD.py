@@ -0,0 +1,51 @@
+# Unit test for the OpenSCAD module
+
+#***************************************************************************
+#*                                                                         *
+#*   This file is part of the FreeCAD CAx development system.              *
+#*                                                                         *
+#*   This program is free software; you can redistribute it and/or modify  *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)    *
+#*   as published by the Free Software Foundation; either version 2 of     *
+#*   the License, or (at your option) any later version.                   *
+#*   for detail see the LICENCE text file.                                 *
+#*                                                                         *
+#*   FreeCAD is distributed in the hope that it will be useful,            *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#*   GNU Library General Public License for more details.                  *
+#*                                                                         *
+#*   You should have received a copy of the GNU Library General Public     *
+#*   License along with FreeCAD; if not, write to the Free Software        *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+#*   USA                                                                   *
+#*                                                                         *
+#***************************************************************************/
+
+import FreeCAD, unittest, itertools, Part
+from FreeCAD import Vector
+
+def makeSquare(x,y,size):
+    "returns a square face in the XY plane"
+    pts = [Vector(x,y,0),Vector(x+size,y,0),Vector(x+size,y+size,0),Vector(x,y+size,0)]
+    return Part.Face(Part.makePolygon(pts+[pts[0]]))
+
+class OpenSCADTest(unittest.TestCase):
+
+    def testOverlappingfaces(self):
+        FreeCAD.Console.PrintLog ('Checking OpenSCAD Overlappingfaces...\n')
+        from OpenSCAD2Dgeom import Overlappingfaces
+        big = makeSquare(0,0,10)
+        nested = makeSquare(4,4,2)
+        partial = makeSquare(8,8,4)
+        of = Overlappingfaces([nested,partial,big])
+        faces = of.sortedfaces
+        # the former test of all the face pairs
+        old = {}
+        for i,j in itertools.combinations(range(len(faces)),2):
+            if Overlappingfaces.dofacesoverlapboolean(faces[i],faces[j]):
+                old.setdefault(i,[]).append(j)
+        pairs = Overlappingfaces.boundboxoverlappairs(faces)
+        self.failUnless(old == {0:[1,2]},"OpenSCAD Overlappingfaces: unexpected overlaps")
+        self.failUnless(pairs == [(0,1),(0,2)],"OpenSCAD Overlappingfaces: wrong candidate pairs")
+        self.failUnless(of.isinsidedict == old,"OpenSCAD Overlappingfaces failed")
@@ -111,20 +111,49 @@ def insert(filename,docname):
         pathName = os.path.dirname(os.path.normpath(filename))
         processcsg(filename)
 
+# The lexer and parser are built on the first import and kept for the next
+# ones. The parser tables are pickled in the user directory, so later
+# sessions don't need to regenerate them; yacc checks them against the
+# signature of the grammar and rebuilds them if it has changed.
+csglexer = None
+csgparser = None
+
+def getParserTableFile():
+    "returns the path of the pickled parser tables, in the user directory"
+    return os.path.join(FreeCAD.ConfigGet("UserAppData"),"csgparsetab.pickle")
+
+def getParser():
+    "returns the lexer and parser, building them if needed"
+    global csglexer, csgparser
+    if csgparser is None:
+        # Build the lexer
+        if printverbose: print 'Start Lex'
+        csglexer = lex.lex(module=tokrules)
+        if printverbose: print 'End Lex'
+
+        # Build the parser
+        if printverbose: print 'Load Parser'
+        # No debug out otherwise Linux has protection exception
+        try:
+            csgparser = yacc.yacc(debug=0,picklefile=getParserTableFile())
+        except (IOError,OSError):
+            # the user directory is not writable
+            csgparser = yacc.yacc(debug=0,write_tables=0)
+        if printverbose: print 'Parser Loaded'
+    return csglexer, csgparser
+
 def processcsg(filename):
     global doc
     
     if printverbose: print 'ImportCSG Version 0.5d'
-    # Build the lexer
-    if printverbose: print 'Start Lex'
-    lex.lex(module=tokrules)
-    if printverbose: print 'End Lex'
-
-    # Build the parser   
-    if printverbose: print 'Load Parser'
-    # No debug out otherwise Linux has protection exception
-    parser = yacc.yacc(debug=0)
-    if printverbose: print 'Parser Loaded'
+    lexer, parser = getParser()
+    lexer.lineno = 1
+    global deduplicate
+    deduplicate = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+        GetBool('useInstancesForDuplicates',True)
+    nodekeys.clear()
+    nodeobjects.clear()
+    dedupstats[:] = [0,0]
     # Give the lexer some input
     #f=open('test.scad', 'r')
     f = pythonopen(filename, 'r')
@@ -132,12 +161,14 @@ def processcsg(filename):
 
     if printverbose: print 'Start Parser'
     # Swap statements to enable Parser debugging
-    #result = parser.parse(f.read(),debug=1)
-    result = parser.parse(f.read())
+    #result = parser.parse(f.read(),lexer=lexer,debug=1)
+    result = parser.parse(f.read(),lexer=lexer)
     f.close()
     if printverbose:
         print 'End Parser'
         print result  
+    if dedupstats[0]:
+        FreeCAD.Console.PrintMessage('%d duplicate subtrees imported as instances, %d objects saved\n' % tuple(dedupstats))
     FreeCAD.Console.PrintMessage('End processing CSG file\n')
     doc.recompute()
 
@@ -201,7 +232,10 @@ def p_statement(p):
                  | render_action
                  | not_supported
     '''
-    p[0] = p[1]
+    if deduplicate and p[1]:
+        p[0] = [instanceduplicate(obj) for obj in p[1]]
+    else:
+        p[0] = p[1]
 
 def p_anymodifier(p):
     '''anymodifier : MODIFIERBACK
@@ -354,7 +388,95 @@ def placeholder(name,children,arguments):
     #don't hide the children
     return newobj
 
+# Repeated subtrees (the same operation on the same children, as generated for
+# bolt patterns and such) are only built once. Every object created gets a
+# structural key, made from its type and properties and the keys and
+# placements of its children, but not its own placement. When an operation
+# has the key of an object imported before, it is replaced by an Instance of
+# that object with its own placement, and its subtree is removed.
+deduplicate = True
+nodekeys = {}    # object name -> key
+nodeobjects = {} # key -> first object with that key
+dedupstats = [0,0] # instances created, objects removed
+
+def getvaluekey(value):
+    "returns a hashable key for a property value"
+    if hasattr(value,'TypeId') and hasattr(value,'InList'): # document object
+        return (getnodekey(value),getvaluekey(value.Placement))
+    elif isinstance(value,(list,tuple)):
+        return tuple([getvaluekey(v) for v in value])
+    elif isinstance(value,FreeCAD.Vector):
+        return (value.x,value.y,value.z)
+    elif isinstance(value,FreeCAD.Placement):
+        return (getvaluekey(value.Base),value.Rotation.Q)
+    elif isinstance(value,FreeCAD.Matrix):
+        return tuple(value.A)
+    elif value is None or isinstance(value,(bool,int,long,float,basestring)):
+        return value
+    else:
+        return repr(value)
+
+def getnodekey(obj):
+    "returns the structural key of an object, independent of its own placement"
+    if obj.Name in nodekeys:
+        return nodekeys[obj.Name]
+    if isinstance(getattr(obj,'Proxy',None),Instance):
+        key = getnodekey(obj.Base)
+    else:
+        props = []
+        for prop in sorted(obj.PropertiesList):
+            if prop in ('Placement','Label','Proxy','Visibility'):
+                continue
+            if prop == 'Shape':
+                # only the shape of plain features is data, the others are computed
+                if obj.TypeId == 'Part::Feature':
+                    props.append((prop,obj.Shape.hashCode()))
+                continue
+            if prop == 'Mesh':
+                props.append((prop,obj.Name))
+                continue
+            props.append((prop,getvaluekey(getattr(obj,prop))))
+        key = (obj.TypeId,getattr(obj,'Proxy',None).__class__.__name__,tuple(props))
+    nodekeys[obj.Name] = key
+    return key
+
+def removesubtree(obj):
+    "removes obj and the objects it uses that are not used by any other"
+    children = obj.OutList
+    key = nodekeys.pop(obj.Name,None)
+    if (key in nodeobjects) and (nodeobjects[key].Name == obj.Name):
+        del nodeobjects[key]
+    doc.removeObject(obj.Name)
+    dedupstats[1] += 1
+    for child in children:
+        if not child.InList:
+            removesubtree(child)
+
+def instanceduplicate(obj):
+    '''returns obj, or if it is an operation identical to one imported before,
+    an Instance of the earlier one at the placement of obj'''
+    if not obj.OutList or isinstance(getattr(obj,'Proxy',None),Instance):
+        # primitives are cheap to build
+        return obj
+    key = getnodekey(obj)
+    first = nodeobjects.setdefault(key,obj)
+    if first.Name == obj.Name:
+        return obj
+    if printverbose: print "Instance of",first.Name
+    newobj=doc.addObject("Part::FeaturePython",'instance')
+    Instance(newobj,first)
+    newobj.Placement = obj.Placement
+    newobj.Label = "instance of %s" % first.Label
+    if gui:
+        newobj.ViewObject.Proxy = 0
+    removesubtree(obj)
+    nodekeys[newobj.Name] = key
+    dedupstats[0] += 1
+    dedupstats[1] -= 1 # the instance
+    return newobj
+
 def CGALFeatureObj(name,children,arguments=[]):
+    children = meshestosolids(children)
     myobj=doc.addObject("Part::FeaturePython",name)
     CGALFeature(myobj,name,children,str(arguments))
     if gui:
@@ -466,6 +588,7 @@ def fuse(lst,name):
     # Is this Multi Fuse
     elif len(lst) > 2:
        if printverbose: print "Multi Fuse"
+       lst = meshestosolids(lst)
        myfuse = doc.addObject('Part::MultiFuse',name)
        myfuse.Shapes = lst
        if gui:
@@ -473,6 +596,7 @@ def fuse(lst,name):
                subobj.ViewObject.hide()
     else:
        if printverbose: print "Single Fuse"
+       lst = meshestosolids(lst)
        myfuse = doc.addObject('Part::Fuse',name)
        myfuse.Base = lst[0]
        myfuse.Tool = lst[1]
@@ -501,6 +625,7 @@ def p_difference_action(p):
         p[0] = p[5]
     else:
 # Cut using Fuse    
+        p[5] = meshestosolids(p[5])
         mycut = doc.addObject('Part::Cut',p[1])
         mycut.Base = p[5][0]
 #       Can only Cut two objects do we need to fuse extras
@@ -520,6 +645,8 @@ def p_intersection_action(p):
     'intersection_action : intersection LPAREN RPAREN OBRACE block_list EBRACE'
 
     if printverbose: print "intersection"
+    if (len(p[5]) > 1):
+        p[5] = meshestosolids(p[5])
     # Is this Multi Common
     if (len(p[5]) > 2):
        if printverbose: print "Multi Common"
@@ -754,6 +881,9 @@ def p_multmatrix_action(p):
         part = fuse(p[6],"Matrix Union")
     else :
         part = p[6][0]
+    if not isspecialorthogonalpython(fcsubmatrix(transform_matrix)):
+        # the other transformations work on shapes
+        part = meshtosolid(part)
     if (isspecialorthogonalpython(fcsubmatrix(transform_matrix))) :
         if printverbose: print "special orthogonal"
         if matrixisrounded:
@@ -1055,10 +1185,54 @@ def p_polygon_action_plus_path(p) :
          p[0] = [mypolygon]
 #        This only pushes last polygon
 
-def make_face(v1,v2,v3):
-    wire = Part.makePolygon([v1,v2,v3,v1])
-    face = Part.Face(wire)
-    return face
+# Polyhedra with more triangles than this are not refined, merging coplanar
+# triangles is too slow on the meshes of surface() or of STL files
+polyhedronrefinelimit = 1000
+
+def makepolyhedronshape(points,facets):
+    '''builds a solid from a list of vectors and a list of triangles given as
+    tuples of point indices. The triangles are built and sewn on their shared
+    vertices in a single call'''
+    sh = Part.Shape()
+    sh.makeShapeFromMesh((points,facets),1e-6)
+    solids = []
+    for shell in sh.Shells:
+        solid = Part.Solid(shell)
+        if solid.Volume < 0:
+            solid.reverse()
+        solids.append(solid)
+    if len(solids) == 1:
+        sh = solids[0]
+        if len(facets) <= polyhedronrefinelimit:
+            sh = sh.removeSplitter()
+    elif solids:
+        sh = Part.makeCompound(solids)
+    return sh
+
+def meshtosolid(obj):
+    '''returns obj, or if it is a polyhedron imported as a mesh, a new solid
+    replacing it'''
+    if not obj.isDerivedFrom('Mesh::Feature'):
+        return obj
+    if printverbose: print "Convert mesh",obj.Name
+    mesh = obj.Mesh.copy()
+    plm = mesh.Placement
+    mesh.Placement = FreeCAD.Placement()
+    points,facets = mesh.Topology
+    newobj = doc.addObject('Part::Feature',obj.Name)
+    newobj.Shape = makepolyhedronshape(points,facets)
+    newobj.Placement = plm
+    newobj.Label = obj.Label
+    if gui:
+        newobj.ViewObject.ShapeColor = obj.ViewObject.ShapeColor
+        newobj.ViewObject.Transparency = obj.ViewObject.Transparency
+    nodekeys.pop(obj.Name,None)
+    doc.removeObject(obj.Name)
+    return newobj
+
+def meshestosolids(objs):
+    "converts the polyhedra imported as meshes in objs, for the operations that need shapes"
+    return [meshtosolid(obj) for obj in objs]
 
 def p_polyhedron_action(p) :
     '''polyhedron_action : polyhedron LPAREN points EQ OSQUARE points_list_3d ESQUARE COMMA faces EQ OSQUARE points_list_3d ESQUARE COMMA keywordargument_list RPAREN SEMICOL
@@ -1072,17 +1246,20 @@ def p_polyhedron_action(p) :
         print v
         print "Polyhedron triangles"
         print p[12]
-    faces_list = []    
-    mypolyhed = doc.addObject('Part::Feature',p[1])
-    for i in p[12] :
-        if printverbose: print i
-        f = make_face(v[int(i[0])],v[int(i[1])],v[int(i[2])])
-        faces_list.append(f)
-    shell=Part.makeShell(faces_list)
-    solid=Part.Solid(shell).removeSplitter()
-    if solid.Volume < 0:
-        solid.reverse()
-    mypolyhed.Shape=solid
+    faces_list = [(int(i[0]),int(i[1]),int(i[2])) for i in p[12]]
+    if FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+        GetBool('usePolyhedronMesh'):
+        # imported as a mesh, and only converted to a solid if an
+        # operation needs it (see meshtosolid)
+        import Mesh
+        mesh = Mesh.Mesh((v,faces_list))
+        if mesh.Volume < 0:
+            mesh.flipNormals()
+        mypolyhed = doc.addObject('Mesh::Feature',p[1])
+        mypolyhed.Mesh = mesh
+    else:
+        mypolyhed = doc.addObject('Part::Feature',p[1])
+        mypolyhed.Shape = makepolyhedronshape(v,faces_list)
     p[0] = [mypolyhed]
 
 def p_projection_action(p) :
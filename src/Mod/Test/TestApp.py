@@ -46,6 +46,7 @@ def All():
     suite.addTest(unittest.defaultTestLoader.loadTestsFromName("TestSketcherApp") )
     suite.addTest(unittest.defaultTestLoader.loadTestsFromName("TestPartApp") )
     suite.addTest(unittest.defaultTestLoader.loadTestsFromName("TestPartDesignApp") )
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName("TestOpenSCAD") )
     # gui tests of modules
     if ( FreeCAD.GuiUp == 1):
         suite.addTest(unittest.defaultTestLoader.loadTestsFromName("TestSketcherGui") )
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the face sorting of the Arch vector renderer (ArchVRM.py).
+# Builds an oblique view of a grid of staggered boxes and compares the
+# occlusion graph sort with the former insertion sort, giving the number of
+# faces retained and the time spent.
+# Usage: from the FreeCAD python console:
+#     import benchArchVRM
+#     benchArchVRM.bench()          # about 1500 visible faces, graph sort only
+#     benchArchVRM.bench(6,True)    # small scene, both sorts
+
+import time
+import FreeCAD, Part, ArchVRM
+
+def makeShapes(size=22):
+    "returns a list of size*size boxes, staggered in height so they overlap in a side view"
+    shapes = []
+    for i in range(size):
+        for j in range(size):
+            b = Part.makeBox(800,800,1000+(i*j)%7*300)
+            b.translate(FreeCAD.Vector(i*1000,j*1000,(i+j)%3*200))
+            shapes.append(b)
+    return shapes
+
+def run(shapes,graphsort):
+    "sorts the faces of the given shapes, returns the number of faces and retained faces and the time"
+    ArchVRM.GRAPHSORT = graphsort
+    r = ArchVRM.Renderer()
+    r.setWorkingPlane(FreeCAD.Placement(FreeCAD.Vector(0,0,0),FreeCAD.Rotation(FreeCAD.Vector(1,-1,0),60)))
+    r.addShapes(shapes)
+    r.removeHidden()
+    r.reorient()
+    num = len(r.faces)
+    t0 = time.time()
+    r.sort()
+    t1 = time.time()
+    return num, len(r.faces), t1-t0
+
+def bench(size=22,legacy=False):
+    shapes = makeShapes(size)
+    modes = [True]
+    if legacy:
+        modes.append(False)
+    debug = ArchVRM.DEBUG
+    ArchVRM.DEBUG = False
+    for mode in modes:
+        num, kept, t = run(shapes,mode)
+        if mode:
+            name = "graph sort:    "
+        else:
+            name = "insertion sort:"
+        print "benchArchVRM:", name, num, "faces,", kept, "retained in %.2f s" % t
+    ArchVRM.DEBUG = debug
+    ArchVRM.GRAPHSORT = True
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the dxf exporter (importDXF.export). Exports a document made
+# of many polylines and circles with the streaming writer and with the former
+# in-memory dxfLibrary.Drawing, and gives the wall time and the peak memory
+# (RSS) of each. Each export runs in a forked process, so the peak memory of
+# one doesn't hide the other; run it from FreeCADCmd on a posix system:
+#     import benchDXFExport
+#     benchDXFExport.bench()
+
+import os, time, tempfile, resource
+import FreeCAD, Part, importDXF
+
+NUMOBJECTS = 20000
+
+def makeDocument(num=NUMOBJECTS):
+    "creates a document with num polylines and circles"
+    doc = FreeCAD.newDocument("benchDXFExport")
+    for i in range(num):
+        x = (i%100)*100
+        y = (i/100)*100
+        if i%2:
+            pts = [FreeCAD.Vector(x,y,0),FreeCAD.Vector(x+50,y,0),FreeCAD.Vector(x+50,y+30,0),FreeCAD.Vector(x,y+60,0)]
+            sh = Part.makePolygon(pts)
+        else:
+            sh = Part.makeCircle(20,FreeCAD.Vector(x,y,0))
+        o = doc.addObject("Part::Feature","Shape")
+        o.Shape = sh
+    return doc
+
+def run(objs,filename,stream):
+    "exports objs in a child process, returns the time, the peak RSS in MB and the file size in MB"
+    r,w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        importDXF.dxfStreamExport = stream
+        t0 = time.time()
+        importDXF.export(objs,filename)
+        t = time.time()-t0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0
+        os.write(w,"%f %f" % (t,rss))
+        os._exit(0)
+    os.close(w)
+    res = os.read(r,100)
+    os.waitpid(pid,0)
+    t,rss = [float(v) for v in res.split()]
+    return t, rss, os.path.getsize(filename)/1048576.0
+
+def bench(num=NUMOBJECTS):
+    doc = makeDocument(num)
+    fd, filename = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0
+    print "benchDXFExport:", num, "objects, RSS before export %.1f MB" % base
+    for stream in [True,False]:
+        t, rss, size = run(doc.Objects,filename,stream)
+        if stream:
+            name = "streaming:"
+        else:
+            name = "in memory:"
+        print "  %-11s %.2f s, peak RSS %.1f MB, file %.1f MB" % (name,t,rss,size)
+    os.remove(filename)
+    FreeCAD.closeDocument(doc.Name)
+
+if __name__ == "__main__":
+    bench()
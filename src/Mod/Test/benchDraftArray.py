@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the Draft Array object. Builds rectangular arrays of a
+# detailed base object (a filleted box with holes) with and without the
+# Instancing property, and gives the recompute time and the peak memory (RSS)
+# of each. Each array is computed in a forked process, so the peak memory of
+# one doesn't hide the other; run it from FreeCADCmd on a posix system:
+#     import benchDraftArray
+#     benchDraftArray.bench()          # 50x50 array
+#     benchDraftArray.bench(20,20)
+
+import os, time, resource
+import FreeCAD, Part, Draft
+
+def makeBase(doc):
+    "creates a detailed base object"
+    b = Part.makeBox(8,8,4)
+    b = b.makeFillet(0.5,b.Edges)
+    for i in range(3):
+        for j in range(3):
+            c = Part.makeCylinder(0.6,4,FreeCAD.Vector(2+i*2,2+j*2,0))
+            b = b.cut(c)
+    o = doc.addObject("Part::Feature","Base")
+    o.Shape = b
+    return o
+
+def run(doc,base,numx,numy,instancing):
+    "recomputes an array in a child process, returns the time, the peak RSS in MB and the number of faces"
+    r,w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        a = Draft.makeArray(base,FreeCAD.Vector(10,0,0),FreeCAD.Vector(0,10,0),numx,numy)
+        a.Instancing = instancing
+        t0 = time.time()
+        doc.recompute()
+        t = time.time()-t0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0
+        os.write(w,"%f %f %d" % (t,rss,len(a.Shape.Faces)))
+        os._exit(0)
+    os.close(w)
+    res = os.read(r,100)
+    os.waitpid(pid,0)
+    t,rss,faces = res.split()
+    return float(t), float(rss), int(faces)
+
+def bench(numx=50,numy=50):
+    doc = FreeCAD.newDocument("benchDraftArray")
+    base = makeBase(doc)
+    doc.recompute()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0
+    print "benchDraftArray:", numx, "x", numy, "array,", len(base.Shape.Faces), "faces per element, RSS before %.1f MB" % rss
+    for instancing in [True,False]:
+        t, rss, faces = run(doc,base,numx,numy,instancing)
+        if instancing:
+            name = "instances:"
+        else:
+            name = "copies:"
+        print "  %-10s %.2f s, peak RSS %.1f MB," % (name,t,rss), faces, "faces"
+    FreeCAD.closeDocument(doc.Name)
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the edge sorting functions of DraftGeomUtils (sortEdges and
+# findWires). Builds shuffled polylines of 10000 and 100000 segments and
+# gives the number of edges per second processed.
+# Usage: from the FreeCAD python console:
+#     import benchDraftGeomUtils
+#     benchDraftGeomUtils.bench()
+
+import time, random, math
+import FreeCAD, Part, DraftGeomUtils
+
+def makeEdges(num, wires=1):
+    "returns a shuffled list of num line segments forming the given number of open polylines"
+    edges = []
+    per = num/wires
+    for w in range(wires):
+        pts = [FreeCAD.Vector(i*10, math.sin(i*0.1)*100+w*1000, 0) for i in range(per+1)]
+        for i in range(per):
+            if i%2:
+                edges.append(Part.Line(pts[i+1], pts[i]).toShape())
+            else:
+                edges.append(Part.Line(pts[i], pts[i+1]).toShape())
+    random.seed(0)
+    random.shuffle(edges)
+    return edges
+
+def timeit(name, func, edges):
+    t0 = time.time()
+    result = func(edges[:])
+    t1 = time.time()
+    print "  %-14s" % name, len(edges), "edges in %.2f s," % (t1-t0), int(len(edges)/max(t1-t0,1e-6)), "edges/s ->", len(result), "items"
+
+def bench(sizes=(1000, 10000, 100000)):
+    for num in sizes:
+        print "benchDraftGeomUtils:", num, "edges"
+        edges = makeEdges(num)
+        timeit("sortEdges", DraftGeomUtils.sortEdges, edges)
+        timeit("findWires", DraftGeomUtils.findWires, makeEdges(num, 10))
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the Arch internal ifc parser (ifcReader.py). Compares the number
+# of entities per second parsed by the streaming tokenizer (IfcFile.read) with
+# the former line-by-line reader (IfcFile.readLines).
+# Usage: from the FreeCAD python console, or from a system shell with
+# src/Mod/Arch in the PYTHONPATH:
+#     benchIfcReader.py path/to/schema.exp [path/to/file.ifc]
+# If no ifc file is given, a synthetic one is generated with NUMPOINTS points,
+# polylines and polyloops.
+
+import sys, os, time, tempfile
+import ifcReader
+
+NUMPOINTS = 100000
+
+def makeTestFile(numpoints=NUMPOINTS):
+    "writes a synthetic ifc file and returns its path"
+    fd, path = tempfile.mkstemp(suffix=".ifc")
+    f = os.fdopen(fd, "w")
+    f.write("ISO-10303-21;\nHEADER;\nFILE_DESCRIPTION(('benchmark'),'2;1');\nENDSEC;\nDATA;\n")
+    for i in range(1, numpoints+1):
+        f.write("#%d=IFCCARTESIANPOINT((%d.,%d.5,0.));\n" % (i, i, i))
+    n = numpoints
+    for i in range(1, numpoints-2, 3):
+        n += 1
+        f.write("#%d=IFCPOLYLINE((#%d,#%d,#%d));\n" % (n, i, i+1, i+2))
+        n += 1
+        f.write("#%d=IFCPOLYLOOP((#%d,#%d,#%d));\n" % (n, i, i+1, i+2))
+    f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+    f.close()
+    return path
+
+def bench(schema, filename=None):
+    generated = False
+    if not filename:
+        filename = makeTestFile()
+        generated = True
+    print "benchIfcReader: file", filename, "(%s MB)" % round(os.path.getsize(filename)/1048576.0, 1)
+
+    t0 = time.time()
+    num = 0
+    for record in ifcReader.IfcTokenizer(filename):
+        num += 1
+    t1 = time.time()
+    print "  tokenizer only:      ", num, "entities in %.2f s," % (t1-t0), int(num/max(t1-t0,1e-6)), "entities/s"
+
+    t0 = time.time()
+    f = ifcReader.IfcFile(filename, schema)
+    t1 = time.time()
+    num = len(f.entById)
+    print "  IfcFile.read:        ", num, "entities in %.2f s," % (t1-t0), int(num/max(t1-t0,1e-6)), "entities/s"
+
+    t0 = time.time()
+    ents = f.readLines()[0]
+    t1 = time.time()
+    num = len(ents)
+    print "  IfcFile.readLines:   ", num, "entities in %.2f s," % (t1-t0), int(num/max(t1-t0,1e-6)), "entities/s"
+
+    if generated:
+        os.remove(filename)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print "Usage: benchIfcReader.py schema.exp [file.ifc]"
+    else:
+        bench(*sys.argv[1:3])
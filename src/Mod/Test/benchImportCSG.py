@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# benchmark for the startup cost of the csg importer (importCSG.py). Gives the
+# time needed to get a parser when the LALR tables are generated from the
+# grammar (what every import used to do), when they are loaded from the
+# pickled table file, and when the parser built by a previous import is
+# reused, and the time to import a small csg file.
+# Usage: from the FreeCAD python console:
+#     import benchImportCSG
+#     benchImportCSG.bench()
+
+import os, time, tempfile
+import FreeCAD, importCSG
+import ply.lex as lex
+import ply.yacc as yacc
+import tokrules
+
+CSG = "multmatrix([[1, 0, 0, 10], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) {\n\tcube(size = [1, 2, 3], center = false);\n}\n"
+
+def timeit(name, func, num):
+    t0 = time.time()
+    for i in range(num):
+        func()
+    t = (time.time()-t0)/num
+    print "  %-22s %.1f ms" % (name, t*1000)
+
+def generate():
+    lex.lex(module=tokrules)
+    yacc.yacc(module=importCSG, debug=0, write_tables=0)
+
+def load():
+    lex.lex(module=tokrules)
+    yacc.yacc(module=importCSG, debug=0, picklefile=importCSG.getParserTableFile())
+
+def bench(num=10):
+    print "benchImportCSG: average of", num, "runs"
+    timeit("generated tables:", generate, num)
+    importCSG.getParser()
+    timeit("pickled tables:", load, num)
+    timeit("cached parser:", importCSG.getParser, num)
+    fd, filename = tempfile.mkstemp(suffix=".csg")
+    os.write(fd, CSG)
+    os.close(fd)
+    importCSG.doc = FreeCAD.newDocument("benchImportCSG")
+    timeit("import of a small file:", lambda: importCSG.processcsg(filename), num)
+    FreeCAD.closeDocument(importCSG.doc.Name)
+    os.remove(filename)
+
+if __name__ == "__main__":
+    bench()